@@ -0,0 +1,237 @@
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", "3600"))
+# Set to a directory to keep cached analyses across restarts
+ANALYSIS_CACHE_DIR = os.getenv("ANALYSIS_CACHE_DIR", "")
+# Most bytes of cache files kept in ANALYSIS_CACHE_DIR; the oldest go first
+ANALYSIS_CACHE_DIR_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_DIR_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+class TTLCache:
+    """Thread-safe LRU cache of strings with a TTL and a bound on the memory they take.
+
+    Sizes are the strings' in-memory footprint (sys.getsizeof), so non-ASCII
+    text, stored at 2 or 4 bytes per character, counts at its real cost.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # key -> (stored at, value, size in bytes)
+        self._entries: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value, _ = entry
+            if time.monotonic() - stored_at > self.ttl:
+                self._remove(key)
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: str):
+        size = sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic(), value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_source(source) -> str:
+    """SHA-256 of a PDF given as a path, a bytes-like object or a BytesIO"""
+    if isinstance(source, (str, os.PathLike)):
+        return hash_file(source)
+    if isinstance(source, io.BytesIO):
+        with source.getbuffer() as view:
+            return hashlib.sha256(view).hexdigest()
+    return hashlib.sha256(source).hexdigest()
+
+
+def normalize_role(target_role: str) -> str:
+    return " ".join((target_role or "").lower().split())
+
+
+class AnalysisCache:
+    """Content-addressed cache for extracted resume text and analysis results.
+
+    Text is keyed by the SHA-256 of the uploaded PDF only, so re-submitting the
+    same resume for another role skips PDF parsing. Results are keyed by the
+    hash plus the normalized target role. Values are stored as JSON, so every
+    read hands back a fresh copy that callers are free to mutate.
+    """
+
+    def __init__(self, max_bytes: int = ANALYSIS_CACHE_MAX_BYTES, ttl: float = ANALYSIS_CACHE_TTL,
+                 disk_dir: str = ANALYSIS_CACHE_DIR, disk_max_bytes: int = ANALYSIS_CACHE_DIR_MAX_BYTES):
+        # Extracted text dominates memory, give it most of the budget
+        self.texts = TTLCache(max_bytes * 3 // 4, ttl)
+        self.results = TTLCache(max_bytes // 4, ttl)
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._disk_puts = 0
+        self._disk_lock = threading.Lock()
+        # Mixed into result keys; changing it retires results from older rules/data
+        self.results_version = ""
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_evict()
+
+    # ============ DISK TIER ============
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _disk_put(self, key: str, value: str):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing analysis cache file: {e}")
+            return
+        with self._disk_lock:
+            self._disk_puts += 1
+            evict = self._disk_puts % 100 == 0
+        if evict:
+            self._disk_evict()
+
+    def _disk_evict(self):
+        """Delete expired cache files, then the oldest until the directory fits disk_max_bytes"""
+        now = time.time()
+        files = []
+        try:
+            with os.scandir(self.disk_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".json"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                        if now - stat.st_mtime > self.ttl:
+                            os.remove(entry.path)
+                        else:
+                            files.append((stat.st_mtime, stat.st_size, entry.path))
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"Error evicting analysis cache files: {e}")
+            return
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def _get(self, tier: TTLCache, key: str) -> Optional[Any]:
+        value = tier.get(key)
+        if value is None:
+            value = self._disk_get(key)
+            if value is None:
+                return None
+            tier.put(key, value)
+        return json.loads(value)
+
+    def _put(self, tier: TTLCache, key: str, data: Any):
+        value = json.dumps(data)
+        tier.put(key, value)
+        self._disk_put(key, value)
+
+    # ============ PUBLIC API ============
+
+    def get_text(self, content_hash: str) -> Optional[Tuple[str, List[str]]]:
+        data = self._get(self.texts, f"text-{content_hash}")
+        return (data["text"], data["chunks"]) if data else None
+
+    def put_text(self, content_hash: str, full_text: str, chunks: List[str]):
+        self._put(self.texts, f"text-{content_hash}", {"text": full_text, "chunks": chunks})
+
+    def _result_key(self, content_hash: str, target_role: str) -> str:
+        role_hash = hashlib.sha256(f"{self.results_version}|{normalize_role(target_role)}".encode()).hexdigest()[:16]
+        return f"result-{content_hash}-{role_hash}"
+
+    def get_result(self, content_hash: str, target_role: str) -> Optional[Dict]:
+        return self._get(self.results, self._result_key(content_hash, target_role))
+
+    def put_result(self, content_hash: str, target_role: str, result: Dict):
+        self._put(self.results, self._result_key(content_hash, target_role), result)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {"text": self.texts.stats(), "result": self.results.stats()}
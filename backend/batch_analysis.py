@@ -0,0 +1,307 @@
+"""Bulk resume analysis: every PDF in a directory or archive against a list of roles.
+
+Used by POST /resume/analyze-batch and from the command line:
+
+    cd backend && python batch_analysis.py resumes.zip --roles "Data Scientist,Nurse" \
+        [--user-id UUID] [--output results.jsonl] [--workers N]
+
+Results are written as JSONL, one line per (resume, role), followed by a
+summary line with the throughput. With a user id the analyses are also
+bulk-inserted into `resumes` under that user.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from analysis_cache import hash_file
+from database import save_resume_analyses
+from resume_index import ResumeIndex
+from resume_sections import ResumeSections
+
+# Worker processes per batch; each builds its own engine once
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", str(os.cpu_count() or 1)))
+# Rows per bulk insert into resumes
+BATCH_INSERT_SIZE = int(os.getenv("BATCH_INSERT_SIZE", "100"))
+# Most PDFs accepted in one batch
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "10000"))
+# Largest single PDF in a batch, uploaded or inside an archive
+BATCH_MAX_PDF_BYTES = int(os.getenv("BATCH_MAX_PDF_BYTES", str(10 * 1024 * 1024)))
+# Most bytes one batch may write to disk: uploads plus the PDFs unpacked from archives
+BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")
+
+# One batch at a time per server process: a batch already uses every core
+batch_slot = threading.Lock()
+
+
+# ============ INPUT ============
+
+class BatchTooLarge(ValueError):
+    """A batch went over BATCH_MAX_FILES, BATCH_MAX_PDF_BYTES or BATCH_MAX_BYTES"""
+
+
+class BatchBudget:
+    """Files and bytes taken into one batch so far, checked before anything is written"""
+
+    def __init__(self, max_files: int = BATCH_MAX_FILES, max_bytes: int = BATCH_MAX_BYTES):
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.files = 0
+        self.bytes = 0
+
+    def add_file(self, name: str, size: Optional[int] = None) -> int:
+        """Count one more PDF (of known size, if given); returns its number in the batch"""
+        if self.files >= self.max_files:
+            raise BatchTooLarge(f"More than {self.max_files} PDFs in one batch")
+        if size is not None and size > BATCH_MAX_PDF_BYTES:
+            raise BatchTooLarge(f"{name} is larger than {BATCH_MAX_PDF_BYTES / (1024 * 1024):g} MB")
+        self.claim(size or 0)
+        self.files += 1
+        return self.files - 1
+
+    def claim(self, size: int):
+        if self.bytes + size > self.max_bytes:
+            raise BatchTooLarge(f"Batch larger than {self.max_bytes / (1024 * 1024):g} MB")
+        self.bytes += size
+
+
+def copy_capped(source, path: str, limit: Optional[int] = None, budget: Optional[BatchBudget] = None):
+    """Stream source into path, stopping past limit bytes or once the batch budget is spent"""
+    written = 0
+    with open(path, "wb") as target:
+        for block in iter(lambda: source.read(1024 * 1024), b""):
+            written += len(block)
+            if limit is not None and written > limit:
+                raise BatchTooLarge(f"File larger than {limit / (1024 * 1024):g} MB")
+            if budget is not None:
+                budget.claim(len(block))
+            target.write(block)
+
+
+def unpack_archive(archive: str, workdir: str, budget: BatchBudget) -> List[Tuple[str, str]]:
+    """Copy the PDFs out of a zip or tar file under numbered names (member paths are never trusted).
+
+    Each member's declared size is checked against the budget before it is
+    copied, so an archive bomb stops at the first member over the limits.
+    """
+    found = []
+
+    def copy(name: str, size: int, open_member):
+        path = os.path.join(workdir, f"{budget.add_file(name, size):06d}.pdf")
+        # The declared size is already claimed; the copy holds the member to it
+        with open_member() as source:
+            copy_capped(source, path, limit=size)
+        found.append((name, path))
+
+    if archive.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(".pdf"):
+                    copy(info.filename, info.file_size, lambda: zf.open(info))
+    else:
+        with tarfile.open(archive) as tf:
+            for member in tf:
+                if member.isfile() and member.name.lower().endswith(".pdf"):
+                    copy(member.name, member.size, lambda: tf.extractfile(member))
+    return found
+
+
+def collect_pdfs(sources: List[str], workdir: str) -> List[Tuple[str, str]]:
+    """(name, path) of every PDF in the given files, directories and archives"""
+    budget = BatchBudget()
+    pdfs = []
+    for source in sources:
+        if os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                for file_name in sorted(files):
+                    path = os.path.join(root, file_name)
+                    if file_name.lower().endswith(".pdf"):
+                        # Read in place, so only the count is limited
+                        budget.add_file(file_name)
+                        pdfs.append((os.path.relpath(path, source), path))
+                    elif file_name.lower().endswith(ARCHIVE_SUFFIXES):
+                        pdfs += unpack_archive(path, workdir, budget)
+        elif source.lower().endswith(ARCHIVE_SUFFIXES):
+            pdfs += unpack_archive(source, workdir, budget)
+        elif source.lower().endswith(".pdf"):
+            budget.add_file(source)
+            pdfs.append((os.path.basename(source), source))
+    return pdfs
+
+
+def parse_roles(roles: str) -> List[str]:
+    """Comma- or newline-separated role list, duplicates dropped"""
+    return list(dict.fromkeys(role.strip() for role in roles.replace("\n", ",").split(",") if role.strip()))
+
+
+# ============ WORKERS ============
+
+_engine = None
+
+
+def _init_worker():
+    global _engine
+    import pdf_extract
+    from rag_engine import CareerAI
+    # The batch already runs one process per core; no nested page pools
+    pdf_extract.PDF_WORKERS = 1
+    _engine = CareerAI()
+
+
+def _analyze_file(name: str, path: str, roles: List[str]) -> Dict:
+    """Worker: one PDF against every role.
+
+    The text is extracted, scanned for features, indexed and split into
+    sections once; each role then only costs its score and skill lists
+    (no roadmap, which batch results do not include).
+    """
+    try:
+        content_hash = hash_file(path)
+        resume_content, _ = _engine.process_pdf(path)
+        if not resume_content:
+            return {"file": name, "error": "no text could be extracted"}
+        features = _engine.extract_features(resume_content)
+        analyses = []
+        for role in roles:
+            _, ats_score, skills_have, skills_need = _engine.assess_resume(resume_content, role, features)
+            analyses.append({
+                "target_role": role,
+                "ats_score": ats_score,
+                "skills_you_have": skills_have,
+                "skills_you_need": skills_need,
+            })
+        return {
+            "file": name,
+            "content_hash": content_hash,
+            "resume_content": resume_content,
+            "resume_index": ResumeIndex.build(resume_content).to_dict(),
+            "resume_sections": ResumeSections.build(resume_content).to_dict(),
+            "analyses": analyses,
+        }
+    except Exception as e:
+        print(f"Error in batch analysis of {name}: {e}")
+        return {"file": name, "error": str(e)}
+
+
+# ============ RUNNER ============
+
+def _resume_rows(user_id: str, done: Dict) -> List[Dict]:
+    """resumes rows for one analyzed file; every row has the same keys, as bulk inserts require"""
+    return [{
+        "user_id": user_id,
+        "target_role": analysis["target_role"],
+        "analysis_json": {
+            "ats_score": analysis["ats_score"],
+            "skills_you_have": analysis["skills_you_have"],
+            "skills_you_need": analysis["skills_you_need"],
+            "source_file": done["file"],
+        },
+        "resume_content": done["resume_content"],
+        "resume_index": done["resume_index"],
+        "resume_sections": done["resume_sections"],
+        "ats_score": analysis["ats_score"],
+    } for analysis in done["analyses"]]
+
+
+def run_batch(pdfs: List[Tuple[str, str]], roles: List[str], user_id: Optional[str] = None,
+              workers: int = BATCH_WORKERS) -> Iterator[Dict]:
+    """Analyze every PDF for every role across a process pool.
+
+    Yields one record per (file, role) as files finish, or one error record
+    per failed file, then a final {"summary": ...} record. With a user_id
+    the results are saved to `resumes` in bulk inserts along the way.
+    """
+    started = time.perf_counter()
+    pending_rows: List[Dict] = []
+    analyzed = failed = saved = 0
+
+    def flush():
+        nonlocal saved
+        if pending_rows:
+            if save_resume_analyses(pending_rows) is not None:
+                saved += len(pending_rows)
+            pending_rows.clear()
+
+    # Spawned, not forked: the server process has threads (and their locks) running
+    pool = ProcessPoolExecutor(max_workers=max(1, min(workers, len(pdfs) or 1)), initializer=_init_worker,
+                               mp_context=multiprocessing.get_context("spawn"))
+    try:
+        futures = {pool.submit(_analyze_file, name, path, roles): name for name, path in pdfs}
+        for future in as_completed(futures):
+            try:
+                done = future.result()
+            except Exception as e:
+                # A worker died (out of memory, crash in a PDF parser): only its files fail
+                print(f"Error in batch analysis of {futures[future]}: {e}")
+                done = {"file": futures[future], "error": str(e)}
+            if "error" in done:
+                failed += 1
+                yield done
+                continue
+            analyzed += 1
+            for analysis in done["analyses"]:
+                yield {"file": done["file"], "content_hash": done["content_hash"], **analysis}
+            if user_id:
+                pending_rows += _resume_rows(user_id, done)
+                if len(pending_rows) >= BATCH_INSERT_SIZE:
+                    flush()
+        if user_id:
+            flush()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    yield {"summary": {
+        "resumes": len(pdfs),
+        "analyzed": analyzed,
+        "failed": failed,
+        "roles": len(roles),
+        "analyses": analyzed * len(roles),
+        "rows_saved": saved,
+        "seconds": round(elapsed, 3),
+        "resumes_per_sec": round(len(pdfs) / elapsed, 2) if elapsed else 0.0,
+    }}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze many resume PDFs against a list of roles")
+    parser.add_argument("sources", nargs="+", help="PDF files, directories or .zip/.tar archives")
+    parser.add_argument("--roles", required=True, help="comma-separated target roles")
+    parser.add_argument("--user-id", help="save the analyses to Supabase under this user")
+    parser.add_argument("--output", help="JSONL file to write (default: stdout)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    args = parser.parse_args()
+
+    roles = parse_roles(args.roles)
+    if not roles:
+        parser.error("--roles needs at least one role")
+    workdir = tempfile.mkdtemp(prefix="resume-batch-")
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        pdfs = collect_pdfs(args.sources, workdir)
+        for record in run_batch(pdfs, roles, args.user_id, args.workers):
+            out.write(json.dumps(record) + "\n")
+            if "summary" in record:
+                summary = record["summary"]
+                print(f"{summary['analyzed']}/{summary['resumes']} resumes x {summary['roles']} roles in "
+                      f"{summary['seconds']:.1f}s: {summary['resumes_per_sec']:.1f} resumes/s, "
+                      f"{summary['rows_saved']} rows saved", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
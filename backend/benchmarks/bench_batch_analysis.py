@@ -0,0 +1,95 @@
+"""Throughput of bulk resume analysis (batch_analysis.run_batch).
+
+Writes synthetic one-page text PDFs, then analyzes each against several
+roles with different worker counts. The baseline calls analyze_resume once
+per (file, role) in this process, as a loop over /resume/analyze would
+(same engine and text cache, no HTTP or database). Nothing is saved.
+
+    cd backend && python benchmarks/bench_batch_analysis.py [resumes] [roles]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("KB_RELOAD_INTERVAL", "0")
+
+from batch_analysis import run_batch
+from rag_engine import CareerAI
+
+ROLES = ["Data Scientist", "Software Engineer", "Nurse", "Marketing Manager", "Accountant", "Teacher"]
+WORDS = ("python sql docker kubernetes react patient care budget sales marketing teaching "
+         "accounting excel tableau machine learning leadership communication").split()
+
+
+def make_pdf(lines) -> bytes:
+    """Smallest valid PDF with the lines as Helvetica text on one page"""
+    escape = lambda line: line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    content = "BT /F1 10 Tf 14 TL 50 780 Td " + " ".join(f"({escape(line)}) Tj T*" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode("latin-1")
+
+
+def make_resume(rng: random.Random, number: int):
+    lines = [f"Candidate {number}", "SUMMARY", " ".join(rng.choices(WORDS, k=12)), "EXPERIENCE"]
+    for job in range(4):
+        lines.append(f"Role {job} at Company {rng.randint(1, 99)} ({2015 + job}-{2016 + job})")
+        lines += ["- " + " ".join(rng.choices(WORDS, k=10)) for _ in range(4)]
+    lines += ["EDUCATION", "B.Sc. Computer Science", "SKILLS", ", ".join(rng.sample(WORDS, 8))]
+    return lines
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    role_count = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    roles = ROLES[:role_count]
+    workdir = tempfile.mkdtemp(prefix="bench-batch-")
+    rng = random.Random(5)
+    pdfs = []
+    for i in range(count):
+        path = os.path.join(workdir, f"resume-{i}.pdf")
+        with open(path, "wb") as f:
+            f.write(make_pdf(make_resume(rng, i)))
+        pdfs.append((os.path.basename(path), path))
+
+    try:
+        print(f"{count} resumes x {len(roles)} roles, {os.cpu_count()} CPUs")
+        ai = CareerAI()
+        started = time.perf_counter()
+        for _, path in pdfs:
+            for role in roles:
+                ai.analyze_resume(path, role)
+        elapsed = time.perf_counter() - started
+        print(f"sequential analyze_resume calls  {count / elapsed:7.1f} resumes/s  {elapsed:6.2f}s")
+
+        for workers in sorted({1, 2, os.cpu_count() or 1}):
+            summary = list(run_batch(pdfs, roles, workers=workers))[-1]["summary"]
+            # Includes starting the worker processes and building their engines
+            print(f"run_batch, {workers} worker(s)         {summary['resumes_per_sec']:7.1f} resumes/s  "
+                  f"{summary['seconds']:6.2f}s  analyzed {summary['analyzed']}/{summary['resumes']}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
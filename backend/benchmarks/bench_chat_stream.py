@@ -0,0 +1,75 @@
+"""Time to first byte of streamed versus whole chat replies.
+
+Starts the mock text-generation server from bench_inference_client (one
+token every few milliseconds), points the engine at it and asks questions
+that only the model answers, through CareerAI.chat_with_intent (whole reply)
+and CareerAI.stream_chat (reply as it is generated).
+
+    cd backend && python benchmarks/bench_chat_stream.py [messages]
+"""
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+with socket.socket() as probe:
+    probe.bind(("127.0.0.1", 0))
+    PORT = probe.getsockname()[1]
+
+# The engine reads its model settings at import
+os.environ.update(
+    LLM_ENABLED="1", LLM_CACHE_ENABLED="0", LLM_DEADLINE="30", KB_RELOAD_INTERVAL="0",
+    HUGGINGFACE_API_KEY="hf_benchmark", HF_INFERENCE_URL=f"http://127.0.0.1:{PORT}/generate",
+)
+
+from bench_inference_client import MODE, MockInference, MockServer
+from rag_engine import CareerAI
+
+TOKEN_DELAY = 0.01
+MAX_TOKENS = 256
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    server = MockServer(("127.0.0.1", PORT), MockInference)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    MODE.update(token_delay=TOKEN_DELAY)
+    ai = CareerAI()
+
+    results = {"whole": ([], []), "stream": ([], [])}
+    try:
+        for i in range(messages):
+            question = f"Tell me about quantum gardening, part {i}"
+
+            started = time.perf_counter()
+            ai.chat_with_intent(f"whole-{i}", question, None, [])
+            elapsed = (time.perf_counter() - started) * 1000
+            results["whole"][0].append(elapsed)
+            results["whole"][1].append(elapsed)
+
+            started = time.perf_counter()
+            _, segments = ai.stream_chat(f"stream-{i}", question, None, [])
+            first = None
+            for _ in segments:
+                if first is None:
+                    first = (time.perf_counter() - started) * 1000
+            results["stream"][0].append(first)
+            results["stream"][1].append((time.perf_counter() - started) * 1000)
+    finally:
+        ai.llm.close()
+        server.shutdown()
+
+    print(f"{MAX_TOKENS} tokens, one every {TOKEN_DELAY * 1000:.0f} ms, {messages} messages")
+    for label, (first, total) in results.items():
+        print(f"{label:<7} first byte median {statistics.median(first):8.1f} ms   "
+              f"full reply median {statistics.median(total):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Exercise the inference client against a local mock text-generation server.
+
+Each scenario runs concurrent generate() calls through a fresh InferenceClient
+and reports latency, retries and circuit-breaker activity:
+
+    healthy   every request answers
+    flaky     a share of requests fail with 503 and are retried
+    down      every request fails: the breaker opens and calls are refused
+    slow      the server answers after the per-call deadline
+
+    cd backend && python benchmarks/bench_inference_client.py [calls]
+"""
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference_client import CircuitBreaker, InferenceClient
+
+# Mutable server behaviour: failure rate, delay before answering, and the gap
+# between tokens of a streamed ("stream": true) reply, in seconds
+MODE = {"fail_rate": 0.0, "delay": 0.0, "token_delay": 0.0}
+
+
+class MockInference(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as the real endpoint
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(MODE["delay"])
+        if random.random() < MODE["fail_rate"]:
+            payload, status = {"error": "Model is currently loading"}, 503
+        else:
+            inputs = body["inputs"]
+            if isinstance(inputs, list):  # batched request: one reply list per input
+                payload = [[{"generated_text": f"Reply to: {text[-40:]}"}] for text in inputs]
+            else:
+                payload = [{"generated_text": f"Reply to: {inputs[-40:]}"}]
+            status = 200
+        if status == 200 and body.get("stream"):
+            self._stream(payload[0]["generated_text"], body["parameters"]["max_new_tokens"])
+            return
+        # A whole reply is ready only once every token is generated
+        time.sleep(MODE["token_delay"] * body["parameters"]["max_new_tokens"])
+        data = json.dumps(payload).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up (deadline) before we answered
+
+    def _stream(self, text: str, max_tokens: int):
+        # Text-generation-inference style server-sent events, chunked
+        words = (text + " and more advice" * max_tokens).split()[:max_tokens]
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i, word in enumerate(words):
+                time.sleep(MODE["token_delay"])
+                event = {"token": {"text": word if i == 0 else f" {word}", "special": False}}
+                data = f"data:{json.dumps(event)}\n\n".encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def run_scenario(name: str, url: str, calls: int, fail_rate: float, delay: float):
+    MODE.update(fail_rate=fail_rate, delay=delay)
+    client = InferenceClient("mock-key", url=url, whoami_url=url, deadline=0.5, retries=2, backoff=0.02,
+                             max_concurrency=8, breaker=CircuitBreaker(failure_threshold=5, reset_timeout=0.5))
+    latencies = []
+    answered = [0]
+    lock = threading.Lock()
+
+    def one(i: int):
+        started = time.perf_counter()
+        text = client.generate(f"question {i}", max_tokens=32)
+        with lock:
+            latencies.append((time.perf_counter() - started) * 1000)
+            answered[0] += text is not None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(one, range(calls)))
+    elapsed = time.perf_counter() - started
+    client.close()
+
+    latencies.sort()
+    stats = client.stats()
+    print(f"{name:<8} answered {answered[0]:4}/{calls}  p50 {statistics.median(latencies):7.1f} ms  "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:7.1f} ms  retried {stats['retried']:4}  "
+          f"refused {stats['rejected']:4}  breaker opens {stats['breaker_opens']:2}  ({elapsed:.2f}s)")
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    random.seed(7)
+    server = MockServer(("127.0.0.1", 0), MockInference)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/generate"
+    try:
+        run_scenario("healthy", url, calls, fail_rate=0.0, delay=0.0)
+        run_scenario("flaky", url, calls, fail_rate=0.3, delay=0.0)
+        run_scenario("down", url, calls, fail_rate=1.0, delay=0.0)
+        run_scenario("slow", url, calls // 4, fail_rate=0.0, delay=1.0)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark chat intent routing over a corpus of messages.
+
+Compares the compiled IntentRouter against the equivalent chain of
+`any(word in message for word in [...])` checks it replaced.
+
+    cd backend && python benchmarks/bench_intent_router.py [repeats]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_router import IntentRouter
+from rag_engine import CHAT_INTENTS
+
+CORPUS = [
+    "hello", "hi there!", "good morning, can you help me?", "thanks, that was helpful",
+    "what is my name", "show my resume", "summarize my resume please", "tell me about my experience",
+    "where did i study", "what skills do i have", "show roadmap", "can you change roadmap to cloud",
+    "add docker to my roadmap", "focus my learning on sql", "extend the roadmap by a month",
+    "create a plan for data analyst", "any roadmap tips?", "tell me more", "anything else?",
+    "how do I improve my cv for ats", "how should I prepare for a behavioural interview",
+    "which course should I take to learn machine learning", "I want to switch careers into product",
+    "how do I negotiate a salary offer", "where can I find remote job applications",
+    "should I use linkedin to connect with people", "ok", "sure", "what now",
+    "I have been working as a nurse for five years and would like to move into healthcare "
+    "administration, what certifications or short programmes would be worth doing first?",
+]
+
+
+def route_chain(message_lower: str) -> str:
+    """First matching intent, checking every phrase with a substring scan"""
+    for name, groups in CHAT_INTENTS:
+        if all(any(word in message_lower for word in group) for group in groups):
+            return name
+    return "default"
+
+
+def bench(label: str, fn, messages, repeats: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for message in messages:
+            fn(message)
+    elapsed = time.perf_counter() - started
+    per_message_us = elapsed / (repeats * len(messages)) * 1e6
+    print(f"{label:<10} {per_message_us:8.2f} us/message")
+    return per_message_us
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    messages = [m.lower() for m in CORPUS]
+
+    started = time.perf_counter()
+    router = IntentRouter(CHAT_INTENTS)
+    print(f"compile    {(time.perf_counter() - started) * 1000:8.2f} ms (once per engine)")
+
+    for message in messages:
+        assert router.route(message)[0] == route_chain(message), message
+
+    chain = bench("chain", route_chain, messages, repeats)
+    compiled = bench("compiled", router.route, messages, repeats)
+    print(f"speedup    {chain / compiled:8.2f}x over {len(messages)} messages x {repeats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Throughput of model calls with and without the micro-batcher.
+
+A fake batched backend stands in for an inference server: it runs a few
+requests at a time and each request costs a fixed overhead plus a little per
+prompt, which is what makes batching pay off on GPU-backed endpoints. Many
+threads (like the engine pool under load) each ask for replies, either one
+request per prompt or through MicroBatcher.
+
+    cd backend && python benchmarks/bench_llm_batcher.py [callers] [prompts per caller]
+"""
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_batcher import MicroBatcher
+
+REQUEST_MS = 120    # fixed cost of one inference request
+PER_PROMPT_MS = 6   # extra cost per prompt in a batched request
+SERVER_SLOTS = 2    # requests the fake server runs at once
+
+
+class FakeBatchedModel:
+    """backend(prompts, max_tokens, deadline) with a request-plus-per-prompt cost"""
+
+    def __init__(self):
+        self._slots = threading.Semaphore(SERVER_SLOTS)
+        self.requests = 0
+
+    def __call__(self, prompts, max_tokens, deadline):
+        with self._slots:
+            self.requests += 1
+            cost = (REQUEST_MS + PER_PROMPT_MS * len(prompts)) / 1000
+            if cost > deadline:
+                time.sleep(max(0.0, deadline))
+                return [None] * len(prompts)
+            time.sleep(cost)
+            return [f"reply to {prompt}" for prompt in prompts]
+
+
+def run(label: str, callers: int, per_caller: int, batcher_args=None, deadline: float = 30.0):
+    model = FakeBatchedModel()
+    batcher = MicroBatcher(model, deadline=deadline, **batcher_args) if batcher_args else None
+    latencies = []
+    answered = [0]
+    lock = threading.Lock()
+
+    def caller(index: int):
+        for i in range(per_caller):
+            prompt = f"caller {index} question {i}"
+            started = time.perf_counter()
+            if batcher:
+                reply = batcher.submit(prompt, 128)
+            else:
+                reply = model([prompt], 128, deadline)[0]
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+                answered[0] += reply is not None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        list(pool.map(caller, range(callers)))
+    elapsed = time.perf_counter() - started
+    extra = ""
+    if batcher:
+        stats = batcher.stats()
+        extra = f"  avg batch {stats['avg_batch_size']:5.1f}  timeouts {stats['timeouts']}"
+        batcher.close()
+    latencies.sort()
+    total = callers * per_caller
+    print(f"{label:<22} {total / elapsed:7.1f} calls/s  answered {answered[0]:4}/{total}  "
+          f"requests {model.requests:4}  p50 {statistics.median(latencies):7.1f} ms  "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:7.1f} ms{extra}")
+
+
+def main():
+    callers = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    per_caller = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    run("one request per call", callers, per_caller)
+    run("batched, max 8", callers, per_caller, {"max_batch": 8, "window": 0.01})
+    run("batched, max 32", callers, per_caller, {"max_batch": 32, "window": 0.01})
+    # Callers that give up before a request could finish get None, not a late reply
+    run("batched, 0.1s deadline", callers, per_caller, {"max_batch": 32, "window": 0.01}, deadline=0.1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Replay synthetic chat traffic through the LLM response cache.
+
+Most questions are drawn (skewed towards the popular ones) from a set of
+topics, each asked in several phrasings, by users spread over a few dozen
+role/skill-gap contexts; the rest are one-off questions. Reports the hit rate
+with exact-text keys versus normalized keys, the model calls and tokens
+saved, and what a second worker gets from the shared SQLite tier.
+
+    cd backend && python benchmarks/bench_llm_cache.py [messages]
+"""
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_cache import LLMResponseCache
+
+QUESTIONS = [
+    ["How do I prepare for an interview?", "how to prepare for interviews", "Hey, how should I prepare for an interview",
+     "How do I prepare for an interview"],
+    ["What certifications should I get?", "what certifications do I need", "Which certifications should I get?"],
+    ["How can I stand out to recruiters?", "how do i stand out to recruiters", "How can I stand out to a recruiter?"],
+    ["What should I put in my portfolio?", "what to put in my portfolio", "What should I put in a portfolio?"],
+    ["How do I explain a career gap?", "how to explain a career gap", "Can you tell me how to explain a career gap?"],
+    ["What are good side projects?", "good side projects?", "Give me some good side projects"],
+]
+ROLES = [("software engineer", "tech"), ("data analyst", "tech"), ("staff nurse", "nursing"),
+         ("physiotherapist", "physio"), ("teacher", "education"), ("marketing manager", "business")]
+GAPS = [["sql"], ["docker", "sql"], ["communication"], ["excel", "sql"], ["leadership"]]
+CONTEXTS = [{"role": role, "sector": sector, "skills": [], "building": gap} for role, sector in ROLES for gap in GAPS]
+# Share of messages that are one-off questions no cache can answer
+UNIQUE_SHARE = 0.4
+MODEL_LATENCY_MS = 1200  # typical hosted completion, used to estimate time saved
+
+
+def fake_reply(prompt: str) -> str:
+    return f"Coach reply {hashlib.md5(prompt.encode()).hexdigest()} " + "advice " * 60
+
+
+def replay(cache: LLMResponseCache, traffic, normalize: bool) -> int:
+    """Returns the number of model calls made"""
+    calls = 0
+    for question, context in traffic:
+        prompt = f"{context}\nUser: {question}\nCoach:"
+        if normalize:
+            key = cache.key(question, context, "model", 256)
+        else:
+            key = hashlib.sha256(prompt.encode()).hexdigest()
+        if cache.get(key, prompt) is None:
+            calls += 1
+            cache.put(key, fake_reply(prompt))
+    return calls
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(7)
+    weights = [1 / (rank + 1) for rank in range(len(QUESTIONS))]
+    traffic = []
+    for i in range(messages):
+        if rng.random() < UNIQUE_SHARE:
+            question = f"Is job offer #{i} from company {rng.randrange(10 ** 6)} worth taking?"
+        else:
+            question = rng.choice(rng.choices(QUESTIONS, weights)[0])
+        traffic.append((question, rng.choice(CONTEXTS)))
+
+    for label, normalize in (("exact text", False), ("normalized", True)):
+        cache = LLMResponseCache(enabled=True, db_path="")
+        started = time.perf_counter()
+        calls = replay(cache, traffic, normalize)
+        elapsed_us = (time.perf_counter() - started) * 1e6 / messages
+        stats = cache.stats()
+        saved = stats["prompt_tokens_saved"] + stats["completion_tokens_saved"]
+        print(f"{label:<11} hit rate {stats['hit_rate']:6.1%}  model calls {calls:5}/{messages}  "
+              f"tokens saved {saved:8}  ~{(messages - calls) * MODEL_LATENCY_MS / 1000:7.0f}s of model time saved  "
+              f"({elapsed_us:.1f} us/lookup)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "llm_cache.db")
+        first = LLMResponseCache(enabled=True, db_path=db_path)
+        replay(first, traffic[: messages // 2], normalize=True)
+        # A second worker (or a restart) starts with an empty memory tier
+        second = LLMResponseCache(enabled=True, db_path=db_path)
+        calls = replay(second, traffic[messages // 2:], normalize=True)
+        stats = second.stats()
+        print(f"{'2nd worker':<11} hit rate {stats['hit_rate']:6.1%}  model calls {calls:5}/{messages - messages // 2}  "
+              f"disk hits {stats['disk_hits']}  memory hits {stats['memory_hits']}")
+    print("(tokens estimated at ~4 characters each)")
+
+
+if __name__ == "__main__":
+    main()
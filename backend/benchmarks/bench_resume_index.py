@@ -0,0 +1,108 @@
+"""Benchmark the per-resume BM25 retrieval index and section table.
+
+Builds synthetic resumes (sections of bullet lines, like pypdf output) and
+times what each stage costs: building the index and section table at
+analysis time, loading them from their stored JSON form, and a top-k lookup
+or section slice per chat message. For comparison it also times scoring the
+chunks from scratch on every message (retrieval with nothing persisted) and
+the old `find()` section search.
+
+    cd backend && python benchmarks/bench_resume_index.py [resumes]
+"""
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_index import ResumeIndex, chunk_spans, tokenize
+from resume_sections import ResumeSections
+
+WORDS = ("built led designed migrated improved python sql docker kubernetes react patient care "
+         "clinic budget sales marketing team customers reports pipelines services dashboards "
+         "training analysis research scheduling compliance").split()
+QUERIES = ["experience work history employment", "education academic degree university college",
+           "does my resume mention kubernetes", "is react in my resume", "what projects are on my resume"]
+
+
+def make_resume(rng: random.Random) -> str:
+    lines = ["Jane Candidate", "jane@example.com", "SUMMARY",
+             " ".join(rng.choices(WORDS, k=30)), "EXPERIENCE"]
+    for job in range(rng.randint(3, 6)):
+        lines.append(f"Role {job}, Company {rng.randint(1, 999)} ({2010 + job}-{2011 + job})")
+        lines += ["- " + " ".join(rng.choices(WORDS, k=rng.randint(8, 16))) for _ in range(rng.randint(3, 6))]
+    lines += ["EDUCATION", f"B.Sc. in Subject {rng.randint(1, 50)}, University of Somewhere", "PROJECTS"]
+    lines += ["- " + " ".join(rng.choices(WORDS, k=10)) for _ in range(4)]
+    lines += ["SKILLS", ", ".join(rng.sample(WORDS, 12))]
+    return "\n".join(lines)
+
+
+def score_from_scratch(text: str, query: str, k: int = 3):
+    """BM25 over freshly tokenized chunks: what a lookup costs with no stored index"""
+    spans = chunk_spans(text)
+    counts = [Counter(tokenize(text[s:e])) for s, e in spans]
+    avg = sum(sum(c.values()) for c in counts) / max(1, len(counts))
+    terms = set(tokenize(query))
+    scores = []
+    for doc, c in enumerate(counts):
+        length = sum(c.values())
+        score = 0.0
+        for term in terms:
+            tf = c.get(term, 0)
+            if tf:
+                df = sum(1 for other in counts if term in other)
+                idf = math.log(1 + (len(counts) - df + 0.5) / (df + 0.5))
+                score += idf * tf * 2.2 / (tf + 1.2 * (0.25 + 0.75 * length / avg))
+        if score:
+            scores.append((score, doc))
+    return sorted(scores, reverse=True)[:k]
+
+
+def find_section(text: str, keywords) -> int:
+    lower = text.lower()
+    for keyword in keywords:
+        if keyword in lower:
+            return lower.find(keyword)
+    return -1
+
+
+def timed(fn, items, repeat: int = 1) -> float:
+    """Mean microseconds per item"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    return (time.perf_counter() - started) * 1e6 / (len(items) * repeat)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = random.Random(11)
+    resumes = [make_resume(rng) for _ in range(count)]
+    indexes = [ResumeIndex.build(text) for text in resumes]
+    stored = [json.loads(json.dumps(index.to_dict())) for index in indexes]
+    pairs = [(i, q) for i in range(count) for q in QUERIES]
+    tables = [ResumeSections.build(text).to_dict() for text in resumes]
+
+    chars = sum(map(len, resumes)) / count
+    chunks = sum(len(index.spans) for index in indexes) / count
+    stored_bytes = sum(len(json.dumps(data)) for data in stored) / count
+    print(f"{count} resumes, {chars:.0f} chars and {chunks:.1f} chunks on average; "
+          f"stored index {stored_bytes / 1024:.1f} KB")
+    print(f"build at analysis         {timed(ResumeIndex.build, resumes):8.1f} us/resume")
+    print(f"load from stored JSON     {timed(lambda i: ResumeIndex.from_dict(stored[i], resumes[i]), range(count)):8.1f} us/resume")
+    print(f"top-3 lookup (index)      {timed(lambda p: indexes[p[0]].search(p[1]), pairs, 3):8.1f} us/query")
+    print(f"load + lookup per message {timed(lambda p: ResumeIndex.from_dict(stored[p[0]], resumes[p[0]]).search(p[1]), pairs):8.1f} us/query")
+    print(f"score from scratch        {timed(lambda p: score_from_scratch(resumes[p[0]], p[1]), pairs):8.1f} us/query")
+    print(f"build section table       {timed(ResumeSections.build, resumes):8.1f} us/resume")
+    print(f"load table + slice        {timed(lambda i: ResumeSections.from_dict(tables[i], resumes[i]).section(resumes[i], 'experience'), range(count), 3):8.1f} us/query")
+    print(f"old find() section search {timed(lambda i: find_section(resumes[i], ['experience', 'work history', 'employment']), range(count), 3):8.1f} us/query"
+          "  (first keyword hit, not ranked)")
+
+
+if __name__ == "__main__":
+    main()
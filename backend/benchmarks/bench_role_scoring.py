@@ -0,0 +1,73 @@
+"""Scoring one resume against every role: RoleScorer versus a loop of single-role scores.
+
+Builds role catalogs of several sizes (the real one plus synthetic roles
+that reuse its skill names) and times ranking a resume against all of them,
+either with RoleScorer's sparse per-role sums or by calling calculate_ats_score
+and checking required skills once per role, as a caller would without it.
+
+    cd backend && python benchmarks/bench_role_scoring.py [resumes]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("KB_RELOAD_INTERVAL", "0")
+
+from rag_engine import CareerAI
+from role_scoring import RoleScorer
+
+TITLES = ["engineer", "analyst", "manager", "nurse", "teacher", "developer", "specialist", "consultant"]
+
+
+def synthetic_roles(rng: random.Random, count: int, skills, real):
+    roles = dict(real)
+    while len(roles) < count:
+        roles[f"{rng.choice(skills).lower()} {rng.choice(TITLES)} {len(roles)}"] = tuple(rng.sample(skills, 5))
+    return roles
+
+
+def loop_scores(ai: CareerAI, text: str, roles):
+    """One feature scan and score per role, the way single-role calls would do it"""
+    text_lower = text.lower()
+    results = []
+    for role, required in roles.items():
+        ats = ai.calculate_ats_score(text, role)
+        matched = [skill for skill in required if skill.lower() in text_lower]
+        results.append((-len(matched) / len(required), -ats, role))
+    return sorted(results)
+
+
+def main():
+    resumes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    ai = CareerAI()
+    rng = random.Random(9)
+    skills = [skill for sector in ai.skill_keywords.values() for skill in sector]
+    texts = [" ".join(rng.choices(skills + ["experience", "education", "2021", "team", "led"], k=400))
+             for _ in range(resumes)]
+    real = ai.knowledge_base.role_requirements()
+
+    for count in (len(real), 200, 1000):
+        roles = synthetic_roles(rng, count, skills, real)
+        started = time.perf_counter()
+        scorer = RoleScorer(roles, ai.skill_keywords, ai.feature_extractor)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for text in texts:
+            scorer.score(text, ai.extract_features(text))
+        vector_ms = (time.perf_counter() - started) * 1000 / resumes
+
+        started = time.perf_counter()
+        for text in texts[:3]:
+            loop_scores(ai, text, roles)
+        loop_ms = (time.perf_counter() - started) * 1000 / 3
+
+        print(f"{count:5} roles  build {build_ms:7.1f} ms  RoleScorer {vector_ms:7.2f} ms/resume  "
+              f"per-role loop {loop_ms:8.1f} ms/resume  ({loop_ms / vector_ms:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
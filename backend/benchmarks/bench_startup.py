@@ -0,0 +1,55 @@
+"""Benchmark server cold start.
+
+Times, in fresh interpreters, how long `import main` takes (what a new worker
+pays before it can accept requests) and how long the engine then takes to
+build on first use. HUGGINGFACE_API_KEY is set to a dummy and pointed at an
+unroutable proxy, so any network call made during start-up shows up as a stall.
+
+    cd backend && python benchmarks/bench_startup.py [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from shared_ai import get_engine
+get_engine()
+built = time.perf_counter()
+print(json.dumps({"import_ms": (imported - started) * 1000, "engine_ms": (built - imported) * 1000}))
+"""
+
+
+def run_once() -> dict:
+    env = dict(os.environ)
+    env.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+    env.setdefault("SUPABASE_KEY", "benchmark")
+    env["HUGGINGFACE_API_KEY"] = "hf_benchmark"
+    # 10.255.255.1 does not answer: a blocking request would hang here
+    env["HTTPS_PROXY"] = env["HTTP_PROXY"] = "http://10.255.255.1:9"
+    env["KB_RELOAD_INTERVAL"] = "0"
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, timeout=120, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = [run_once() for _ in range(runs)]
+    for key, label in (("import_ms", "import main"), ("engine_ms", "first engine")):
+        values = [r[key] for r in results]
+        print(f"{label:<13} median {statistics.median(values):8.1f} ms   max {max(values):8.1f} ms")
+    print(f"({runs} fresh interpreters)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Cost of getting an uploaded PDF to the parser: temp file versus memory.
+
+Times the old /resume/analyze path (copy the upload into a temp file, let
+pypdf reopen it by path, delete it) against the in-memory path (read the
+upload into a BytesIO and parse that), for a few resume sizes. Reported
+per upload, with and without the text extraction itself.
+
+    cd backend && python benchmarks/bench_upload_path.py [uploads]
+"""
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_batch_analysis import make_pdf
+from pdf_extract import extract_text
+from routers.resume import _spool_upload
+
+
+def spool_to_disk(source):
+    """The previous upload path: temp file plus hash"""
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+        for block in iter(lambda: source.read(1024 * 1024), b""):
+            digest.update(block)
+            tmp.write(block)
+    return tmp.name, digest.hexdigest()
+
+
+def timed(fn, uploads: int) -> float:
+    """Mean microseconds per call"""
+    started = time.perf_counter()
+    for _ in range(uploads):
+        fn()
+    return (time.perf_counter() - started) * 1e6 / uploads
+
+
+def main():
+    uploads = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"temp dir {tempfile.gettempdir()}, {uploads} uploads per size")
+    for lines in (40, 400):
+        pdf = make_pdf([f"- line {i} led a team of {i % 12} engineers shipping python services" for i in range(lines)])
+
+        def disk(parse: bool):
+            path, _ = spool_to_disk(io.BytesIO(pdf))
+            if parse:
+                extract_text(path)
+            os.remove(path)
+
+        def memory(parse: bool):
+            buffer, _ = _spool_upload(io.BytesIO(pdf))
+            if parse:
+                extract_text(buffer)
+
+        print(f"{len(pdf) / 1024:7.1f} KB  spool: disk {timed(lambda: disk(False), uploads):8.1f} us  "
+              f"memory {timed(lambda: memory(False), uploads):8.1f} us   with parsing: "
+              f"disk {timed(lambda: disk(True), uploads // 10):9.1f} us  memory {timed(lambda: memory(True), uploads // 10):9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from database_async import RowsRejected, save_chat_messages, get_chat_history as _db_get_chat_history
+
+CHAT_FLUSH_BATCH = int(os.getenv("CHAT_FLUSH_BATCH", "100"))
+CHAT_FLUSH_INTERVAL = float(os.getenv("CHAT_FLUSH_INTERVAL", "0.5"))
+CHAT_BUFFER_MAX = int(os.getenv("CHAT_BUFFER_MAX", "10000"))
+# Rows the database refused, kept (newest last) for inspection in stats
+CHAT_REJECTED_KEEP = int(os.getenv("CHAT_REJECTED_KEEP", "100"))
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class ChatWriteBuffer:
+    """Write-behind buffer for chat_messages.
+
+    Messages from every user are queued in process and flushed as multi-row
+    inserts once CHAT_FLUSH_BATCH rows are waiting or CHAT_FLUSH_INTERVAL
+    seconds pass. Until a row is flushed it is still returned by
+    get_chat_history, so a user always sees their own latest turn.
+
+    A batch that fails in transport or with a 5xx is retried whole on the
+    next tick; inserts skip ids already stored, so that is safe. A batch the
+    database rejects (4xx) is split until the offending rows are isolated;
+    those are set aside and the rest are written.
+    """
+
+    def __init__(self, batch_size: int = CHAT_FLUSH_BATCH, interval: float = CHAT_FLUSH_INTERVAL,
+                 max_buffered: int = CHAT_BUFFER_MAX):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_buffered = max_buffered
+        self._buffer: List[Dict] = []
+        # user_id -> rows not yet confirmed written, oldest first
+        self._pending: Dict[str, List[Dict]] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.flushed = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+        self.rejected = 0
+        self._rejected_rows: deque = deque(maxlen=CHAT_REJECTED_KEEP)
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    def enqueue(self, messages: List[Dict]):
+        """Queue rows (user_id, role, content) for the next bulk insert"""
+        for message in messages:
+            # Client-side ids let history reads drop rows that were flushed mid-read
+            message.setdefault("id", str(uuid.uuid4()))
+            message.setdefault("created_at", utc_now())
+            self._buffer.append(message)
+            self._pending.setdefault(message["user_id"], []).append(message)
+
+        overflow = len(self._buffer) - self.max_buffered
+        if overflow > 0:
+            print(f"Chat write buffer full, dropping {overflow} oldest messages")
+            self._forget(self._buffer[:overflow])
+            del self._buffer[:overflow]
+            self.dropped += overflow
+
+        self._ensure_task()
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def pending_for(self, user_id: str) -> List[Dict]:
+        return list(self._pending.get(user_id, ()))
+
+    async def get_chat_history(self, user_id: str, limit: int = 10) -> List[Dict]:
+        """Recent history from the database plus this user's unflushed messages"""
+        pending = self.pending_for(user_id)
+        history = await _db_get_chat_history(user_id, limit=limit)
+        if not pending:
+            return history
+        stored_ids = {row.get("id") for row in history}
+        merged = history + [
+            {"id": m["id"], "role": m["role"], "content": m["content"]}
+            for m in pending if m["id"] not in stored_ids
+        ]
+        return merged[-limit:]
+
+    def _forget(self, rows: List[Dict]):
+        ids_by_user: Dict[str, set] = {}
+        for row in rows:
+            ids_by_user.setdefault(row["user_id"], set()).add(row["id"])
+        for user_id, ids in ids_by_user.items():
+            remaining = [m for m in self._pending.get(user_id, ()) if m["id"] not in ids]
+            if remaining:
+                self._pending[user_id] = remaining
+            else:
+                self._pending.pop(user_id, None)
+
+    def _ensure_task(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write everything buffered, one bulk insert per batch"""
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+
+                started = time.perf_counter()
+                retry = await self._insert(batch)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self.flushes += 1
+                self.last_flush_ms = elapsed_ms
+                self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+                self._total_flush_ms += elapsed_ms
+
+                if retry:
+                    # Keep the unwritten rows and retry on the next tick
+                    self.failures += 1
+                    self._buffer[:0] = retry
+                    break
+
+    async def _insert(self, rows: List[Dict]) -> List[Dict]:
+        """Insert rows, halving rejected batches down to the bad rows; returns rows to retry later"""
+        try:
+            result = await save_chat_messages(rows)
+        except RowsRejected as e:
+            if len(rows) == 1:
+                print(f"Chat message {rows[0]['id']} rejected, dropping it: {e}")
+                self.rejected += 1
+                self._rejected_rows.append({**rows[0], "error": str(e)})
+                self._forget(rows)
+                return []
+            middle = len(rows) // 2
+            retry = await self._insert(rows[:middle])
+            if retry:
+                return retry + rows[middle:]
+            return await self._insert(rows[middle:])
+        if result is None:
+            return rows
+        self.flushed += len(rows)
+        self._forget(rows)
+        return []
+
+    def rejected_rows(self) -> List[Dict]:
+        """The most recent rows the database refused, with the error"""
+        return list(self._rejected_rows)
+
+    async def start(self):
+        self._ensure_task()
+
+    async def stop(self):
+        """Stop the flush loop and write whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "queue_depth": len(self._buffer),
+            "pending_users": len(self._pending),
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+        }
+
+
+chat_writer = ChatWriteBuffer()
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict
+
+from fastapi import HTTPException
+
+# Engine work (PDF parsing, scoring, roadmap/chat generation)
+ENGINE_WORKERS = int(os.getenv("ENGINE_WORKERS", str(os.cpu_count() or 1)))
+ENGINE_QUEUE = int(os.getenv("ENGINE_QUEUE", "32"))
+# Blocking I/O (Supabase round trips, temp files)
+IO_WORKERS = int(os.getenv("IO_WORKERS", "32"))
+IO_QUEUE = int(os.getenv("IO_QUEUE", "256"))
+
+
+class BoundedExecutor:
+    """Thread pool with a cap on queued work; callers over the cap get a 503"""
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        # Raised on the event loop, lowered from worker threads when a call finishes
+        self.in_flight = 0
+        self._count_lock = threading.Lock()
+        self.rejected = 0
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail=f"Server busy ({self.name}), please retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        with self._count_lock:
+            self.in_flight += 1
+        try:
+            future = self._executor.submit(partial(fn, *args, **kwargs))
+        except Exception:
+            self._finished(None)
+            raise
+        # Counted until the thread is done: a cancelled caller does not stop work already running
+        future.add_done_callback(self._finished)
+        return await asyncio.wrap_future(future)
+
+    def _finished(self, _future):
+        with self._count_lock:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.max_workers),
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+engine_pool = BoundedExecutor("engine", ENGINE_WORKERS, ENGINE_QUEUE)
+io_pool = BoundedExecutor("io", IO_WORKERS, IO_QUEUE)
+
+
+async def run_cpu(fn: Callable, *args, **kwargs) -> Any:
+    """Run CPU-bound engine work off the event loop"""
+    return await engine_pool.run(fn, *args, **kwargs)
+
+
+async def run_io(fn: Callable, *args, **kwargs) -> Any:
+    """Run blocking I/O (database calls, file copies) off the event loop"""
+    return await io_pool.run(fn, *args, **kwargs)
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    return {"engine": engine_pool.stats(), "io": io_pool.stats()}
+
+
+def shutdown_pools():
+    engine_pool.shutdown()
+    io_pool.shutdown()
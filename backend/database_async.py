@@ -0,0 +1,253 @@
+import asyncio
+import os
+import httpx
+from dotenv import load_dotenv
+from typing import List, Dict, Any, Optional
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+# Connection pool tuning for the PostgREST HTTP client
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "100"))
+DB_MAX_KEEPALIVE = int(os.getenv("DB_MAX_KEEPALIVE", "20"))
+DB_KEEPALIVE_EXPIRY = float(os.getenv("DB_KEEPALIVE_EXPIRY", "30"))
+DB_TIMEOUT = float(os.getenv("DB_TIMEOUT", "10"))
+
+# An AsyncClient's pool belongs to the event loop that created it
+_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+def _get_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        # Checked on first use, so importing this module never fails or blocks
+        if not SUPABASE_URL or not SUPABASE_KEY:
+            raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
+        client = httpx.AsyncClient(
+            base_url=f"{SUPABASE_URL.rstrip('/')}/rest/v1",
+            headers={
+                "apikey": SUPABASE_KEY,
+                "Authorization": f"Bearer {SUPABASE_KEY}",
+                "Content-Type": "application/json",
+            },
+            limits=httpx.Limits(
+                max_connections=DB_MAX_CONNECTIONS,
+                max_keepalive_connections=DB_MAX_KEEPALIVE,
+                keepalive_expiry=DB_KEEPALIVE_EXPIRY,
+            ),
+            timeout=DB_TIMEOUT,
+        )
+        _clients[loop] = client
+    return client
+
+async def close_client():
+    """Close the pooled client owned by the running event loop."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+class RowsRejected(Exception):
+    """PostgREST refused the rows themselves (HTTP 4xx); resending them unchanged cannot succeed."""
+
+async def _request(method: str, table: str, params: Dict[str, Any] = None, json: Any = None,
+                   timeout: Optional[float] = None, prefer: Optional[str] = None) -> List[Dict]:
+    """Run one PostgREST call and return the affected/selected rows."""
+    headers = None
+    if method in ("POST", "PATCH"):
+        headers = {"Prefer": "return=representation" + (f",{prefer}" if prefer else "")}
+    response = await _get_client().request(
+        method,
+        f"/{table}",
+        params=params,
+        json=json,
+        headers=headers,
+        timeout=timeout if timeout is not None else DB_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json() if response.content else []
+
+# ============ RESUME FUNCTIONS ============
+
+async def save_resume_analysis(user_id: str, role: str, data: dict, resume_content: str = None, ats_score: int = 0,
+                               resume_index: dict = None, resume_sections: dict = None, timeout: Optional[float] = None):
+    """Save resume analysis results to Supabase."""
+    try:
+        insert_data = {
+            "user_id": user_id,
+            "target_role": role,
+            "analysis_json": data,
+            "ats_score": ats_score
+        }
+        if resume_content:
+            insert_data["resume_content"] = resume_content
+        if resume_index:
+            insert_data["resume_index"] = resume_index
+        if resume_sections:
+            insert_data["resume_sections"] = resume_sections
+
+        return await _request("POST", "resumes", json=insert_data, timeout=timeout)
+    except Exception as e:
+        print(f"Error saving resume analysis: {e}")
+        return None
+
+async def save_resume_analyses(rows: List[Dict], timeout: Optional[float] = None):
+    """Save several resume analyses (rows with the same columns) in one insert."""
+    if not rows:
+        return []
+    try:
+        return await _request("POST", "resumes", json=rows, timeout=timeout)
+    except Exception as e:
+        print(f"Error saving resume analyses: {e}")
+        return None
+
+async def get_user_resume_history(user_id: str, timeout: Optional[float] = None) -> List[Dict]:
+    """Get all resume analyses for a user (history)."""
+    try:
+        return await _request("GET", "resumes", params={
+            "select": "id,target_role,ats_score,analysis_json,created_at",
+            "user_id": f"eq.{user_id}",
+            "order": "created_at.desc",
+        }, timeout=timeout)
+    except Exception as e:
+        print(f"Error fetching resume history: {e}")
+        return []
+
+async def get_resume_by_id(resume_id: str, timeout: Optional[float] = None) -> Optional[Dict]:
+    """Get a specific resume analysis by ID."""
+    try:
+        rows = await _request("GET", "resumes", params={
+            "select": "*",
+            "id": f"eq.{resume_id}",
+            "limit": 1,
+        }, timeout=timeout)
+        return rows[0] if rows else None
+    except Exception as e:
+        print(f"Error fetching resume: {e}")
+        return None
+
+async def get_user_resume_content(user_id: str, timeout: Optional[float] = None) -> Optional[Dict]:
+    """Get the most recent resume content for RAG context."""
+    try:
+        rows = await _request("GET", "resumes", params={
+            "select": "resume_content,target_role,resume_index,resume_sections,analysis_json",
+            "user_id": f"eq.{user_id}",
+            "order": "created_at.desc",
+            "limit": 1,
+        }, timeout=timeout)
+        return rows[0] if rows else None
+    except Exception as e:
+        print(f"Error fetching resume content: {e}")
+        return None
+
+# ============ ROADMAP FUNCTIONS ============
+
+async def save_roadmap(user_id: str, title: str, data: dict, resume_id: str = None, timeout: Optional[float] = None):
+    """Save generated roadmap to Supabase."""
+    try:
+        insert_data = {
+            "user_id": user_id,
+            "title": title,
+            "roadmap_json": data,
+            "progress": 0,
+            "completed_weeks": []
+        }
+        return await _request("POST", "roadmaps", json=insert_data, timeout=timeout)
+    except Exception as e:
+        print(f"Error saving roadmap: {e}")
+        return None
+
+async def get_user_roadmaps(user_id: str, timeout: Optional[float] = None) -> List[Dict]:
+    """Retrieve all roadmaps for a user."""
+    try:
+        return await _request("GET", "roadmaps", params={
+            "select": "*",
+            "user_id": f"eq.{user_id}",
+            "order": "created_at.desc",
+        }, timeout=timeout)
+    except Exception as e:
+        print(f"Error fetching roadmaps: {e}")
+        return []
+
+async def get_latest_roadmap(user_id: str, timeout: Optional[float] = None) -> Optional[Dict]:
+    """Get user's most recent roadmap."""
+    try:
+        rows = await _request("GET", "roadmaps", params={
+            "select": "*",
+            "user_id": f"eq.{user_id}",
+            "order": "created_at.desc",
+            "limit": 1,
+        }, timeout=timeout)
+        return rows[0] if rows else None
+    except Exception as e:
+        print(f"Error fetching latest roadmap: {e}")
+        return None
+
+async def update_roadmap_progress(roadmap_id: str, progress: int, completed_weeks: List[int],
+                                  timeout: Optional[float] = None):
+    """Update roadmap progress."""
+    try:
+        return await _request("PATCH", "roadmaps", params={"id": f"eq.{roadmap_id}"}, json={
+            "progress": progress,
+            "completed_weeks": completed_weeks,
+            "updated_at": "now()"
+        }, timeout=timeout)
+    except Exception as e:
+        print(f"Error updating roadmap progress: {e}")
+        return None
+
+# ============ CHAT FUNCTIONS ============
+
+async def save_chat_message(user_id: str, role: str, content: str, timeout: Optional[float] = None):
+    """Save a chat message to conversation history."""
+    try:
+        return await _request("POST", "chat_messages", json={
+            "user_id": user_id,
+            "role": role,
+            "content": content
+        }, timeout=timeout)
+    except Exception as e:
+        print(f"Error saving chat message: {e}")
+        return None
+
+async def save_chat_messages(messages: List[Dict], timeout: Optional[float] = None):
+    """Save several chat messages (dicts with id, user_id, role, content) in one insert.
+
+    Rows whose id is already stored are skipped, so resending a batch whose
+    first insert timed out after committing is harmless. Returns None on
+    transport errors and 5xx; raises RowsRejected when the batch is refused.
+    """
+    if not messages:
+        return []
+    try:
+        return await _request("POST", "chat_messages", params={"on_conflict": "id"}, json=messages,
+                              timeout=timeout, prefer="resolution=ignore-duplicates")
+    except httpx.HTTPStatusError as e:
+        if 400 <= e.response.status_code < 500:
+            raise RowsRejected(f"HTTP {e.response.status_code}: {e.response.text[:200]}") from e
+        print(f"Error saving chat messages: {e}")
+        return None
+    except Exception as e:
+        print(f"Error saving chat messages: {e}")
+        return None
+
+async def get_chat_history(user_id: str, limit: int = 10, timeout: Optional[float] = None) -> List[Dict]:
+    """Get recent chat history for context."""
+    try:
+        rows = await _request("GET", "chat_messages", params={
+            "select": "id,role,content",
+            "user_id": f"eq.{user_id}",
+            "order": "created_at.desc",
+            "limit": limit,
+        }, timeout=timeout)
+        return list(reversed(rows))
+    except Exception as e:
+        print(f"Error fetching chat history: {e}")
+        return []
+
+# ============ LEGACY COMPATIBILITY ============
+
+async def get_user_analyses(user_id: str) -> List[Dict]:
+    """Alias for get_user_resume_history."""
+    return await get_user_resume_history(user_id)
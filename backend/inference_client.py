@@ -0,0 +1,299 @@
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+# Hosted text-generation endpoint; point both URLs at a local server to test
+HF_MODEL = os.getenv("HF_MODEL", "mistralai/Mistral-7B-Instruct-v0.2")
+HF_INFERENCE_URL = os.getenv("HF_INFERENCE_URL", f"https://api-inference.huggingface.co/models/{HF_MODEL}")
+HF_WHOAMI_URL = os.getenv("HF_WHOAMI_URL", "https://huggingface.co/api/whoami-v2")
+# Chat only calls the model when this is on; otherwise rule-based replies are used
+LLM_ENABLED = os.getenv("LLM_ENABLED", "false").lower() in ("1", "true", "yes")
+
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "15"))
+LLM_RETRIES = int(os.getenv("LLM_RETRIES", "2"))
+LLM_BACKOFF = float(os.getenv("LLM_BACKOFF", "0.25"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "16"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+
+# Upstream answers worth retrying: rate limits, model loading, gateway trouble
+_RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after repeated failures.
+
+    Closed: calls flow. After `failure_threshold` consecutive failures it
+    opens and every call is refused for `reset_timeout` seconds; then one
+    trial call is let through (half-open) and its outcome closes or reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, reset_timeout: float = LLM_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self.opens = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            # A failed trial reopens; otherwise open once the threshold is hit
+            if self._trial_running or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self.opens += 1
+            self._trial_running = False
+
+    def cancel_trial(self):
+        """The allowed call never reached the upstream; let another one try"""
+        with self._lock:
+            self._trial_running = False
+
+
+class InferenceClient:
+    """Text generation over one pooled keep-alive HTTP client.
+
+    generate() never raises: it returns None when the call is refused (open
+    breaker, too many calls in flight) or fails within its deadline, and the
+    caller falls back to its rule-based reply.
+    """
+
+    def __init__(self, api_key: Optional[str], url: str = HF_INFERENCE_URL, whoami_url: str = HF_WHOAMI_URL,
+                 deadline: float = LLM_DEADLINE, retries: int = LLM_RETRIES, backoff: float = LLM_BACKOFF,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY, max_connections: int = LLM_MAX_CONNECTIONS,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.api_key = api_key
+        self.url = url
+        self.whoami_url = whoami_url
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._client = httpx.Client(
+            headers={"Authorization": f"Bearer {api_key}"} if api_key else {},
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=deadline,
+        )
+        self._stats_lock = threading.Lock()
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.retried = 0
+        self.rejected = 0
+        self.shed = 0
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def check_auth(self, timeout: float = 10) -> bool:
+        """True if the API key is accepted (used by the background health probe)"""
+        if not self.api_key:
+            return False
+        try:
+            return self._client.get(self.whoami_url, timeout=timeout).status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    def generate(self, prompt: str, max_tokens: int = 256, deadline: Optional[float] = None) -> Optional[str]:
+        """Generated text, or None if the model could not answer within the deadline"""
+        payload = {"inputs": prompt, "parameters": {"max_new_tokens": max_tokens, "return_full_text": False}}
+        return self._request(payload, deadline, self._parse)
+
+    def generate_batch(self, prompts: List[str], max_tokens: int = 256,
+                       deadline: Optional[float] = None) -> List[Optional[str]]:
+        """Several prompts in one request (for endpoints that take a list of inputs).
+
+        Returns one entry per prompt, None where there is no answer.
+        """
+        payload = {"inputs": list(prompts), "parameters": {"max_new_tokens": max_tokens, "return_full_text": False}}
+        results = self._request(payload, deadline, lambda data: self._parse_batch(data, len(prompts)))
+        return results or [None] * len(prompts)
+
+    def _request(self, payload: Dict, deadline: Optional[float], parse: Callable[[Any], Any]) -> Optional[Any]:
+        if not self.api_key:
+            return None
+        self._count("calls")
+        if not self.breaker.allow():
+            self._count("rejected")
+            return None
+
+        expires = time.monotonic() + (deadline if deadline is not None else self.deadline)
+        # Wait for a slot only as long as the deadline allows
+        if not self._slots.acquire(timeout=max(0.0, expires - time.monotonic())):
+            self._count("shed")
+            self.breaker.cancel_trial()
+            return None
+        try:
+            result = self._post_with_retries(payload, expires, parse)
+        finally:
+            self._slots.release()
+
+        if result is None:
+            self._count("failures")
+            self.breaker.record_failure()
+        else:
+            self._count("successes")
+            self.breaker.record_success()
+        return result
+
+    def _post_with_retries(self, payload: Dict, expires: float, parse: Callable[[Any], Any]) -> Optional[Any]:
+        for attempt in range(self.retries + 1):
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                response = self._client.post(self.url, json=payload, timeout=remaining)
+                if response.status_code == 200:
+                    return parse(response.json())
+                if response.status_code not in _RETRY_STATUS:
+                    print(f"LLM call rejected: HTTP {response.status_code}")
+                    return None
+            except (httpx.HTTPError, ValueError) as e:
+                print(f"Error calling LLM: {e}")
+
+            if attempt < self.retries:
+                # Full jitter keeps retries from many workers from lining up
+                pause = random.uniform(0, self.backoff * (2 ** attempt))
+                if time.monotonic() + pause >= expires:
+                    return None
+                self._count("retried")
+                time.sleep(pause)
+        return None
+
+    def generate_stream(self, prompt: str, max_tokens: int = 256, deadline: Optional[float] = None) -> Iterator[str]:
+        """Yield generated text token by token as the model produces it.
+
+        The deadline bounds the wait for the first token (retries included)
+        and each gap between tokens after it. Yields nothing if the model could
+        not start answering, so the caller can fall back like with generate().
+        The generator returns True only if the reply was streamed to the end.
+        """
+        if not self.api_key:
+            return False
+        self._count("calls")
+        if not self.breaker.allow():
+            self._count("rejected")
+            return False
+
+        expires = time.monotonic() + (deadline if deadline is not None else self.deadline)
+        if not self._slots.acquire(timeout=max(0.0, expires - time.monotonic())):
+            self._count("shed")
+            self.breaker.cancel_trial()
+            return False
+        streamed = complete = False
+        try:
+            payload = {"inputs": prompt, "parameters": {"max_new_tokens": max_tokens, "return_full_text": False},
+                       "stream": True}
+            for attempt in range(self.retries + 1):
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    with self._client.stream("POST", self.url, json=payload, timeout=remaining) as response:
+                        if response.status_code == 200:
+                            for text in self._iter_tokens(response):
+                                streamed = True
+                                yield text
+                            complete = streamed
+                            break
+                        if response.status_code not in _RETRY_STATUS:
+                            print(f"LLM call rejected: HTTP {response.status_code}")
+                            break
+                except (httpx.HTTPError, ValueError) as e:
+                    print(f"Error streaming from LLM: {e}")
+                    if streamed:
+                        break  # part of the reply is out; it cannot be retried
+
+                if attempt < self.retries:
+                    pause = random.uniform(0, self.backoff * (2 ** attempt))
+                    if time.monotonic() + pause >= expires:
+                        break
+                    self._count("retried")
+                    time.sleep(pause)
+        finally:
+            self._slots.release()
+            if streamed:
+                self._count("successes")
+                self.breaker.record_success()
+            else:
+                self._count("failures")
+                self.breaker.record_failure()
+        return complete
+
+    @staticmethod
+    def _iter_tokens(response: httpx.Response) -> Iterator[str]:
+        # Server-sent events: data:{"token": {"text": "...", "special": false}, ...}
+        for line in response.iter_lines():
+            if not line.startswith("data:"):
+                continue
+            token = json.loads(line[5:]).get("token") or {}
+            text = token.get("text")
+            if text and not token.get("special"):
+                yield text
+
+    @staticmethod
+    def _parse(data) -> Optional[str]:
+        # Text-generation responses look like [{"generated_text": "..."}]
+        if isinstance(data, list) and data:
+            data = data[0]
+        if isinstance(data, dict):
+            text = data.get("generated_text")
+            if isinstance(text, str) and text.strip():
+                return text.strip()
+        return None
+
+    @classmethod
+    def _parse_batch(cls, data, count: int) -> Optional[List[Optional[str]]]:
+        # One entry per input, each shaped like a single response
+        if not isinstance(data, list) or len(data) != count:
+            return None
+        return [cls._parse(item) for item in data]
+
+    def stats(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "retried": self.retried,
+            "rejected": self.rejected,
+            "shed": self.shed,
+            "breaker": self.breaker.state,
+            "breaker_opens": self.breaker.opens,
+        }
+
+    def close(self):
+        self._client.close()
@@ -0,0 +1,77 @@
+import re
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+from skill_matcher import trie_pattern
+
+# (intent name, trigger groups). An intent matches when every group has at
+# least one phrase in the message; an intent with no groups always matches.
+IntentSpec = Tuple[str, Sequence[Sequence[str]]]
+
+
+class Intent:
+    __slots__ = ("name", "priority", "groups", "mask")
+
+    def __init__(self, name: str, priority: int, groups: Tuple[FrozenSet[str], ...], mask: int):
+        self.name = name
+        self.priority = priority
+        self.groups = groups
+        # One bit per trigger group; the intent matches when all its bits are set
+        self.mask = mask
+
+
+class IntentRouter:
+    """Routes a chat message to intents with one compiled regex pass.
+
+    Phrases match as plain substrings of the lowercased message (so "thank"
+    also covers "thankful"). Intents are ranked by their position in the
+    table: earlier entries win.
+    """
+
+    def __init__(self, specs: Sequence[IntentSpec]):
+        self.intents: List[Intent] = []
+        group_bits: Dict[str, int] = {}
+        bit = 0
+        for priority, (name, groups) in enumerate(specs):
+            groups = tuple(frozenset(p.lower() for p in group) for group in groups)
+            mask = 0
+            for group in groups:
+                for phrase in group:
+                    group_bits[phrase] = group_bits.get(phrase, 0) | (1 << bit)
+                mask |= 1 << bit
+                bit += 1
+            self.intents.append(Intent(name, priority, groups, mask))
+
+        # The regex reports one phrase per start position, so a match on
+        # "my resume content" must also count for "my resume" and "resume"
+        phrases = list(group_bits)
+        self._implied: Dict[str, FrozenSet[str]] = {
+            phrase: frozenset(other for other in phrases if other in phrase) for phrase in phrases
+        }
+        self._phrase_bits: Dict[str, int] = {}
+        for phrase, implied in self._implied.items():
+            bits = 0
+            for other in implied:
+                bits |= group_bits[other]
+            self._phrase_bits[phrase] = bits
+        self._pattern = re.compile("(?=(" + trie_pattern(phrases) + "))") if phrases else None
+
+    def _group_bits(self, message_lower: str) -> int:
+        if self._pattern is None:
+            return 0
+        bits = 0
+        for phrase in set(self._pattern.findall(message_lower)):
+            bits |= self._phrase_bits[phrase]
+        return bits
+
+    def matched_phrases(self, message_lower: str) -> FrozenSet[str]:
+        if self._pattern is None:
+            return frozenset()
+        found = set()
+        for phrase in set(self._pattern.findall(message_lower)):
+            found |= self._implied[phrase]
+        return frozenset(found)
+
+    def route(self, message_lower: str) -> List[str]:
+        """All matching intent names, best first"""
+        bits = self._group_bits(message_lower)
+        return [intent.name for intent in self.intents if intent.mask & bits == intent.mask]
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from role_index import role_key
+
+_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Versioned JSON source (edited by hand) and the SQLite file compiled from it
+KB_SOURCE_PATH = os.getenv("KB_SOURCE_PATH", os.path.join(_DATA_DIR, "knowledge_base.json"))
+KB_DB_PATH = os.getenv("KB_DB_PATH", "")
+# Bytes of the compiled file each connection maps instead of reading into its own cache
+KB_MMAP_BYTES = int(os.getenv("KB_MMAP_BYTES", str(256 * 1024 * 1024)))
+# Seconds between checks of the source file for edits (0 disables hot reload)
+KB_RELOAD_INTERVAL = float(os.getenv("KB_RELOAD_INTERVAL", "30"))
+
+# Bump when the compiled table layout changes, so old .db files get rebuilt
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE skills (sector TEXT NOT NULL, sector_pos INTEGER NOT NULL, pos INTEGER NOT NULL,
+                     name TEXT NOT NULL, name_lower TEXT NOT NULL);
+CREATE TABLE roles (key TEXT PRIMARY KEY, pos INTEGER NOT NULL, name TEXT NOT NULL, skills TEXT NOT NULL);
+CREATE TABLE resources (skill TEXT PRIMARY KEY, resources TEXT NOT NULL);
+CREATE INDEX idx_skills_sector ON skills(sector_pos, pos);
+CREATE INDEX idx_skills_lower ON skills(name_lower);
+CREATE INDEX idx_roles_pos ON roles(pos);
+"""
+
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _default_db_path(source_path: str) -> str:
+    """Next to the source, or in the temp dir when that is read-only (e.g. serverless deploys)"""
+    if os.access(os.path.dirname(os.path.abspath(source_path)), os.W_OK):
+        return os.path.splitext(source_path)[0] + ".db"
+    # Keyed by the source path, so two catalogs on one machine keep separate files
+    key = hashlib.sha256(os.path.abspath(source_path).encode()).hexdigest()[:12]
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(tempfile.gettempdir(), f"{name}-{key}.db")
+
+
+def compile_knowledge_base(source_path: str, db_path: str) -> str:
+    """Compile the JSON source into a SQLite file; returns the source hash.
+
+    The file is built aside and swapped in with os.replace, so readers (and
+    other workers) see either the old or the new catalog, never a partial one.
+    """
+    source_hash = _sha256(source_path)
+    with open(source_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    tmp_path = f"{db_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("schema_version", str(SCHEMA_VERSION)),
+            ("version", str(data.get("version", 0))),
+            ("source_sha256", source_hash),
+            ("default_role_skills", json.dumps(data.get("default_role_skills", []))),
+            ("default_resources", json.dumps(data.get("default_resources", []))),
+        ])
+        conn.executemany("INSERT INTO skills VALUES (?, ?, ?, ?, ?)", [
+            (sector, sector_pos, pos, name, name.lower())
+            for sector_pos, (sector, names) in enumerate(data.get("skills", {}).items())
+            for pos, name in enumerate(names)
+        ])
+        roles = {}
+        for pos, (name, skills) in enumerate(data.get("roles", {}).items()):
+            # First spelling wins if two names normalize alike
+            roles.setdefault(role_key(name), (pos, name, json.dumps(skills)))
+        conn.executemany("INSERT INTO roles VALUES (?, ?, ?, ?)",
+                         [(key, pos, name, skills) for key, (pos, name, skills) in roles.items()])
+        conn.executemany("INSERT INTO resources VALUES (?, ?)", [
+            (skill, json.dumps(resources)) for skill, resources in data.get("resources", {}).items()
+        ])
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    return source_hash
+
+
+class KnowledgeBase:
+    """Skill, role and learning-resource catalog backed by a memory-mapped SQLite file.
+
+    The JSON source is compiled once (see compile_knowledge_base) and every
+    worker process maps the same file, so the catalog's pages are shared by
+    the OS instead of being copied into each worker. reload_if_changed picks
+    up edits to the source without a restart.
+    """
+
+    def __init__(self, source_path: str = KB_SOURCE_PATH, db_path: str = KB_DB_PATH):
+        self.source_path = source_path
+        self.db_path = db_path or _default_db_path(source_path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Bumped on every reload; connections opened for an older file are replaced
+        self.generation = 0
+        self.reloads = 0
+        self._source_mtime = 0.0
+        self._load()
+
+    def _load(self):
+        # Read before compiling: an edit made during the compile shows up as a newer mtime
+        mtime = os.path.getmtime(self.source_path)
+        if self._compiled_hash() != _sha256(self.source_path):
+            compile_knowledge_base(self.source_path, self.db_path)
+        self.generation += 1
+        meta = dict(self._conn().execute("SELECT key, value FROM meta"))
+        self.version = int(meta["version"])
+        self.source_hash = meta["source_sha256"]
+        self.default_role_skills: Tuple[str, ...] = tuple(json.loads(meta["default_role_skills"]))
+        self.default_resources: Tuple[str, ...] = tuple(json.loads(meta["default_resources"]))
+        # Only now: a failed compile is retried on the next check, not skipped until the next edit
+        self._source_mtime = mtime
+
+    def _compiled_hash(self) -> Optional[str]:
+        """Source hash recorded in the compiled file, if it is current"""
+        if not os.path.exists(self.db_path):
+            return None
+        try:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            try:
+                meta = dict(conn.execute("SELECT key, value FROM meta"))
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+        if meta.get("schema_version") != str(SCHEMA_VERSION):
+            return None
+        return meta.get("source_sha256")
+
+    def _conn(self) -> sqlite3.Connection:
+        # One read-only connection per thread, reopened after a reload swaps the file
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.generation != self.generation:
+            if conn is not None:
+                conn.close()
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            conn.execute(f"PRAGMA mmap_size={KB_MMAP_BYTES}")
+            self._local.conn = conn
+            self._local.generation = self.generation
+        return conn
+
+    def reload_if_changed(self) -> bool:
+        """Recompile and reopen the catalog if its source file was edited"""
+        try:
+            mtime = os.path.getmtime(self.source_path)
+        except OSError as e:
+            print(f"Error checking knowledge base: {e}")
+            return False
+        if mtime == self._source_mtime:
+            return False
+        with self._lock:
+            if mtime == self._source_mtime:
+                return False
+            previous = self.source_hash
+            try:
+                self._load()
+            except Exception as e:
+                print(f"Error reloading knowledge base: {e}")
+                return False
+        if self.source_hash == previous:
+            return False
+        self.reloads += 1
+        return True
+
+    # ============ LOOKUPS ============
+
+    def skill_keywords(self) -> Dict[str, List[str]]:
+        """Skill names by sector, in source order"""
+        keywords: Dict[str, List[str]] = {}
+        for sector, name in self._conn().execute("SELECT sector, name FROM skills ORDER BY sector_pos, pos"):
+            keywords.setdefault(sector, []).append(name)
+        return keywords
+
+    def role_keys(self) -> List[str]:
+        """Normalized role names, in source order"""
+        return [key for (key,) in self._conn().execute("SELECT key FROM roles ORDER BY pos")]
+
+    def role_skills(self, key: str) -> Optional[Tuple[str, ...]]:
+        row = self._conn().execute("SELECT skills FROM roles WHERE key = ?", (key,)).fetchone()
+        return tuple(json.loads(row[0])) if row else None
+
+    def role_requirements(self) -> Dict[str, Tuple[str, ...]]:
+        """Required skills of every role, by display name as spelled in the source, in source order"""
+        return {name: tuple(json.loads(skills))
+                for name, skills in self._conn().execute("SELECT name, skills FROM roles ORDER BY pos")}
+
+    def resources(self, skill: str) -> Tuple[str, ...]:
+        """Learning resources for a skill, or the defaults"""
+        row = self._conn().execute("SELECT resources FROM resources WHERE skill = ?", (skill,)).fetchone()
+        return tuple(json.loads(row[0])) if row else self.default_resources
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._conn()
+        return {
+            "version": self.version,
+            "skills": conn.execute("SELECT COUNT(*) FROM skills").fetchone()[0],
+            "roles": conn.execute("SELECT COUNT(*) FROM roles").fetchone()[0],
+            "reloads": self.reloads,
+        }
+
+
+_knowledge_base: Optional[KnowledgeBase] = None
+_kb_lock = threading.Lock()
+
+
+def get_knowledge_base() -> KnowledgeBase:
+    """Process-wide catalog, opened on first use"""
+    global _knowledge_base
+    with _kb_lock:
+        if _knowledge_base is None:
+            _knowledge_base = KnowledgeBase()
+    return _knowledge_base
@@ -0,0 +1,160 @@
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Optional
+
+from inference_client import LLM_DEADLINE, LLM_MAX_CONCURRENCY
+
+# Prompts per batched request; 1 sends every call on its own (no batching)
+LLM_BATCH_MAX = int(os.getenv("LLM_BATCH_MAX", "1"))
+# How long the first prompt of a batch waits for others to join it
+LLM_BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "10"))
+
+# backend(prompts, max_tokens, deadline) -> one reply (or None) per prompt
+BatchBackend = Callable[[List[str], int, float], List[Optional[str]]]
+
+
+class _Pending:
+    __slots__ = ("prompt", "max_tokens", "expires", "future")
+
+    def __init__(self, prompt: str, max_tokens: int, expires: float):
+        self.prompt = prompt
+        self.max_tokens = max_tokens
+        self.expires = expires
+        self.future: Future = Future()
+
+
+class MicroBatcher:
+    """Coalesces concurrent model calls into batched requests.
+
+    Callers (engine pool threads) block in submit(). A dispatcher thread
+    takes the first waiting prompt, gathers whatever else arrives within
+    `window` seconds (up to `max_batch`), and sends each group sharing a
+    max_tokens as one backend call; replies are handed back to their callers.
+    Every caller waits only until its own deadline, whatever its batch does.
+    """
+
+    def __init__(self, backend: BatchBackend, max_batch: int = LLM_BATCH_MAX,
+                 window: float = LLM_BATCH_WINDOW_MS / 1000, deadline: float = LLM_DEADLINE,
+                 max_in_flight: int = LLM_MAX_CONCURRENCY):
+        self.backend = backend
+        self.max_batch = max(1, max_batch)
+        self.window = window
+        self.deadline = deadline
+        self._queue: "queue.Queue[Optional[_Pending]]" = queue.Queue()
+        # Batches are sent from here so the dispatcher keeps collecting meanwhile
+        self._senders = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm-batch")
+        self._dispatcher: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.batches = 0
+        self.batched_prompts = 0
+        self.largest_batch = 0
+        self.expired = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def _ensure_started(self):
+        if self._dispatcher is None:
+            with self._lock:
+                if self._dispatcher is None:
+                    self._dispatcher = threading.Thread(target=self._run, name="llm-batcher", daemon=True)
+                    self._dispatcher.start()
+
+    def submit(self, prompt: str, max_tokens: int = 256, deadline: Optional[float] = None) -> Optional[str]:
+        """Reply for one prompt, or None if none arrived within the deadline"""
+        self._ensure_started()
+        timeout = deadline if deadline is not None else self.deadline
+        pending = _Pending(prompt, max_tokens, time.monotonic() + timeout)
+        self._count("submitted")
+        self._queue.put(pending)
+        try:
+            return pending.future.result(timeout=timeout)
+        except FutureTimeout:
+            self._count("timeouts")
+            return None
+
+    # ============ DISPATCH ============
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            closes_at = time.monotonic() + self.window
+            stopping = False
+            while len(batch) < self.max_batch:
+                remaining = closes_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if pending is None:
+                    stopping = True
+                    break
+                batch.append(pending)
+            self._dispatch(batch)
+            if stopping:
+                return
+
+    def _dispatch(self, batch: List[_Pending]):
+        now = time.monotonic()
+        groups: Dict[int, List[_Pending]] = defaultdict(list)
+        for pending in batch:
+            if pending.expires <= now:
+                # Its caller has given up already; don't spend tokens on it
+                self._count("expired")
+                continue
+            groups[pending.max_tokens].append(pending)
+        for max_tokens, group in groups.items():
+            self._senders.submit(self._send, group, max_tokens)
+
+    def _send(self, group: List[_Pending], max_tokens: int):
+        self._count("batches")
+        self._count("batched_prompts", len(group))
+        with self._lock:
+            self.largest_batch = max(self.largest_batch, len(group))
+        # Run as long as the most patient caller waits; the others time out on their own
+        deadline = max(pending.expires for pending in group) - time.monotonic()
+        try:
+            replies = self.backend([pending.prompt for pending in group], max_tokens, deadline)
+            if len(replies) != len(group):
+                raise ValueError(f"backend returned {len(replies)} replies for {len(group)} prompts")
+        except Exception as e:
+            print(f"Error in batched LLM call: {e}")
+            self._count("errors")
+            replies = [None] * len(group)
+        for pending, reply in zip(group, replies):
+            if not pending.future.done():
+                pending.future.set_result(reply)
+
+    def close(self):
+        """Send what is queued, then stop the dispatcher"""
+        if self._dispatcher is not None:
+            self._queue.put(None)
+            self._dispatcher.join(timeout=5)
+        self._senders.shutdown(wait=False)
+
+    def stats(self) -> Dict:
+        return {
+            "max_batch": self.max_batch,
+            "window_ms": self.window * 1000,
+            "submitted": self.submitted,
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_prompts / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "expired": self.expired,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
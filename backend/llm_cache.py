@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from analysis_cache import TTLCache
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "86400"))
+# Set to a file to share cached replies (and opt-outs) across workers and restarts
+LLM_CACHE_DB_PATH = os.getenv("LLM_CACHE_DB_PATH", "")
+LLM_CACHE_DB_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DB_MAX_ENTRIES", "100000"))
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+# Words that change the phrasing of a question but not what is being asked
+_FILLER_WORDS = frozenset([
+    "a", "an", "the", "please", "pls", "kindly", "hey", "hi", "hello", "um", "uh", "so", "just",
+    "can", "could", "would", "will", "you", "me", "i", "my", "do", "does", "should", "to", "for",
+    "some", "any", "tell", "give", "really", "actually", "about",
+])
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English)"""
+    return (len(text) + 3) // 4
+
+
+def normalize_question(text: str) -> str:
+    """Reduce a question to its content words so rephrasings share a key.
+
+    "Hey, how do I prepare for an interview?" and "how to prepare for
+    interviews" both become "how prepare interview". Word order is kept.
+    """
+    words = []
+    for word in _WORD_RE.findall((text or "").lower()):
+        if word in _FILLER_WORDS:
+            continue
+        # Cheap plural folding; only has to be consistent, not correct
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return " ".join(words)
+
+
+class LLMResponseCache:
+    """Model replies keyed by the normalized question plus the context that shaped the prompt.
+
+    An in-memory LRU/TTL tier sits in front of an optional SQLite file
+    (LLM_CACHE_DB_PATH) shared by every worker on the host. Users who opt out
+    are neither served from nor written to the cache.
+    """
+
+    def __init__(self, enabled: bool = LLM_CACHE_ENABLED, max_bytes: int = LLM_CACHE_MAX_BYTES,
+                 ttl: float = LLM_CACHE_TTL, db_path: str = LLM_CACHE_DB_PATH,
+                 db_max_entries: int = LLM_CACHE_DB_MAX_ENTRIES):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.memory = TTLCache(max_bytes, ttl)
+        self.db_path = db_path
+        self.db_max_entries = db_max_entries
+        self._local = threading.local()
+        self._opt_outs: Set[str] = set()
+        self._stats_lock = threading.Lock()
+        self._puts = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.bypassed = 0
+        self.prompt_tokens_saved = 0
+        self.completion_tokens_saved = 0
+        if db_path:
+            with self._conn() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_responses ("
+                    " key TEXT PRIMARY KEY,"
+                    " response TEXT NOT NULL,"
+                    " created_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_created ON llm_responses(created_at)")
+                conn.execute("CREATE TABLE IF NOT EXISTS llm_cache_opt_outs (user_id TEXT PRIMARY KEY)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ============ KEYS ============
+
+    @staticmethod
+    def key(question: str, context: Dict, model: str = "", max_tokens: int = 0) -> str:
+        """Cache key for a question asked in a given context (role, sector, skills...)"""
+        material = json.dumps([normalize_question(question), context, model, max_tokens], sort_keys=True)
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    # ============ OPT-OUT ============
+
+    def set_opt_out(self, user_id: str, opted_out: bool):
+        if opted_out:
+            self._opt_outs.add(user_id)
+        else:
+            self._opt_outs.discard(user_id)
+        if not self.db_path:
+            return
+        try:
+            if opted_out:
+                self._conn().execute("INSERT OR IGNORE INTO llm_cache_opt_outs VALUES (?)", (user_id,))
+            else:
+                self._conn().execute("DELETE FROM llm_cache_opt_outs WHERE user_id = ?", (user_id,))
+        except sqlite3.Error as e:
+            print(f"Error saving LLM cache opt-out: {e}")
+
+    def opted_out(self, user_id: Optional[str]) -> bool:
+        if not user_id:
+            return False
+        if user_id in self._opt_outs:
+            return True
+        if not self.db_path:
+            return False
+        try:
+            # Read through so an opt-out made in another worker applies here too
+            row = self._conn().execute(
+                "SELECT 1 FROM llm_cache_opt_outs WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading LLM cache opt-out: {e}")
+            return True  # when unsure, keep the user's prompts out of the cache
+        return row is not None
+
+    def usable_for(self, user_id: Optional[str]) -> bool:
+        """False when caching is off or the user opted out (counted as bypassed)"""
+        if not self.enabled:
+            return False
+        if self.opted_out(user_id):
+            self._count("bypassed")
+            return False
+        return True
+
+    # ============ LOOKUP ============
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def get(self, key: str, prompt: str = "") -> Optional[str]:
+        response = self.memory.get(key)
+        if response is not None:
+            self._count("memory_hits")
+        else:
+            response = self._disk_get(key)
+            if response is None:
+                self._count("misses")
+                return None
+            self._count("disk_hits")
+            self.memory.put(key, response)
+        # Each hit is a model call not made: its prompt and completion tokens
+        self._count("prompt_tokens_saved", estimate_tokens(prompt))
+        self._count("completion_tokens_saved", estimate_tokens(response))
+        return response
+
+    def put(self, key: str, response: str):
+        if not response:
+            return
+        self.memory.put(key, response)
+        self._count("stores")
+        self._disk_put(key, response)
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        if not self.db_path:
+            return None
+        try:
+            row = self._conn().execute(
+                "SELECT response FROM llm_responses WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.ttl)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading LLM cache: {e}")
+            return None
+        return row[0] if row else None
+
+    def _disk_put(self, key: str, response: str):
+        if not self.db_path:
+            return
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO llm_responses (key, response, created_at) VALUES (?, ?, ?)",
+                (key, response, time.time())
+            )
+            with self._stats_lock:
+                self._puts += 1
+                evict = self._puts % 100 == 0
+            if evict:
+                self._evict()
+        except sqlite3.Error as e:
+            print(f"Error writing LLM cache: {e}")
+
+    def _evict(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (time.time() - self.ttl,))
+        overflow = conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0] - self.db_max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM llm_responses WHERE key IN"
+                " (SELECT key FROM llm_responses ORDER BY created_at LIMIT ?)", (overflow,)
+            )
+
+    def clear(self):
+        self.memory.clear()
+        if self.db_path:
+            self._conn().execute("DELETE FROM llm_responses")
+
+    def stats(self) -> Dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": self.memory.stats()["entries"],
+            "bytes": self.memory.stats()["bytes"],
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "bypassed": self.bypassed,
+            "prompt_tokens_saved": self.prompt_tokens_saved,
+            "completion_tokens_saved": self.completion_tokens_saved,
+        }
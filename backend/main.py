@@ -1,4 +1,6 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
@@ -7,8 +9,62 @@ load_dotenv()
 
 # Import routers
 from routers import resume, roadmap, chat
+from pdf_extract import shutdown_pool
+from concurrency import pool_stats, run_io, shutdown_pools
+from database_async import close_client
+from chat_writer import chat_writer
+from shared_ai import engine_ready, ensure_engine, shared_ai_engine
+from rag_engine import API_PROBE_INTERVAL
+from roadmap_catalog import cache_stats as roadmap_cache_stats
+from knowledge_base import KB_RELOAD_INTERVAL
 
-app = FastAPI(title="AI Career Compass")
+async def warm_up_engine():
+    """Build the engine once the server is up, then keep the API probe fresh"""
+    try:
+        await ensure_engine()
+    except Exception as e:
+        print(f"Error building AI engine: {e}")
+    while True:
+        try:
+            await run_io(shared_ai_engine.probe_api)
+        except Exception as e:
+            print(f"Error probing AI API: {e}")
+        if API_PROBE_INTERVAL <= 0:
+            return
+        await asyncio.sleep(API_PROBE_INTERVAL)
+
+async def watch_knowledge_base():
+    """Hot-reload the skill/role catalog when its source file changes"""
+    while True:
+        await asyncio.sleep(KB_RELOAD_INTERVAL)
+        if not engine_ready():
+            continue  # the engine loads the current catalog when it is built
+        try:
+            await run_io(shared_ai_engine.reload_knowledge_base)
+        except Exception as e:
+            print(f"Error reloading knowledge base: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await chat_writer.start()
+    # Nothing slow or networked happens before the server accepts requests
+    background = [asyncio.create_task(warm_up_engine())]
+    if KB_RELOAD_INTERVAL > 0:
+        background.append(asyncio.create_task(watch_knowledge_base()))
+    yield
+    # Flush buffered chat messages and stop background workers on shutdown
+    for task in background:
+        task.cancel()
+    await chat_writer.stop()
+    shutdown_pool()
+    shutdown_pools()
+    await close_client()
+    if engine_ready():
+        if shared_ai_engine.llm_batcher is not None:
+            shared_ai_engine.llm_batcher.close()
+        shared_ai_engine.llm.close()
+
+app = FastAPI(title="AI Career Compass", lifespan=lifespan)
 
 # CORS for frontend
 app.add_middleware(
@@ -29,7 +85,18 @@ def root():
 
 @app.get("/health")
 def health():
-    return {"status": "healthy"}
+    status = {"status": "healthy", "engine_ready": engine_ready(), "pools": pool_stats(),
+              "chat_writer": chat_writer.stats(), "roadmap_cache": roadmap_cache_stats()}
+    # Don't build the engine just to report on it
+    if engine_ready():
+        status.update(sessions=shared_ai_engine.sessions.stats(),
+                      knowledge_base=shared_ai_engine.knowledge_base.stats(),
+                      api=shared_ai_engine.api_status(),
+                      llm=shared_ai_engine.llm.stats(),
+                      llm_cache=shared_ai_engine.llm_cache.stats())
+        if shared_ai_engine.llm_batcher is not None:
+            status["llm_batch"] = shared_ai_engine.llm_batcher.stats()
+    return status
 
 # For running with uvicorn
 if __name__ == "__main__":
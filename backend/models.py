@@ -18,8 +18,12 @@ class ChatRequest(BaseModel):
     user_id: str
     message: str
 
+class CachePreferenceRequest(BaseModel):
+    opt_out: bool
+
 class ChatResponse(BaseModel):
     response: str
     context_used: bool
     roadmap_updated: bool = False
+    intent: Optional[str] = None
 
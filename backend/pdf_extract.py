@@ -0,0 +1,111 @@
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+# Hard caps so an oversized upload cannot pin a worker
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "200000"))
+
+# Documents with at least this many pages are split across a process pool
+PDF_PARALLEL_PAGES = int(os.getenv("PDF_PARALLEL_PAGES", "16"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if _pool is None and PDF_WORKERS > 1:
+        try:
+            # Spawned, not forked: the pool is started from a thread of the threaded server
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        except Exception as e:
+            print(f"PDF process pool unavailable, extracting sequentially: {e}")
+            return None
+    return _pool
+
+
+def shutdown_pool():
+    """Stop the page-extraction worker processes"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _open_reader(source) -> "PdfReader":
+    # pypdf is imported on first use: it is a large share of server start-up time
+    from pypdf import PdfReader
+    # PdfReader takes paths and streams; wrap raw bytes without writing them anywhere
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    return PdfReader(source)
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """Worker: open the PDF in this process and extract pages [start, stop)"""
+    reader = _open_reader(file_path)
+    return [(reader.pages[i].extract_text() or "") for i in range(start, stop)]
+
+
+def _iter_reader_pages(reader: "PdfReader", max_pages: int, max_chars: int) -> Iterator[str]:
+    remaining = max_chars
+    for index, page in enumerate(reader.pages):
+        if index >= max_pages or remaining <= 0:
+            break
+        text = page.extract_text() or ""
+        if len(text) > remaining:
+            text = text[:remaining]
+        remaining -= len(text)
+        yield text
+
+
+def iter_page_text(source, max_pages: int = None, max_chars: int = None) -> Iterator[str]:
+    """Yield the text of each page, stopping at the page and character caps"""
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+    yield from _iter_reader_pages(_open_reader(source), max_pages, max_chars)
+
+
+def _iter_page_text_parallel(file_path: str, page_count: int, max_chars: int) -> Iterator[str]:
+    pool = _get_pool()
+    step = -(-page_count // PDF_WORKERS)  # ceil division
+    futures = [
+        pool.submit(_extract_page_range, file_path, start, min(start + step, page_count))
+        for start in range(0, page_count, step)
+    ]
+    remaining = max_chars
+    try:
+        for future in futures:
+            for text in future.result():
+                if remaining <= 0:
+                    return
+                if len(text) > remaining:
+                    text = text[:remaining]
+                remaining -= len(text)
+                yield text
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def extract_text(source, max_pages: int = None, max_chars: int = None) -> str:
+    """Extract capped PDF text, fanning large files out over worker processes"""
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+
+    reader = _open_reader(source)
+    page_count = min(len(reader.pages), max_pages)
+
+    # Only file paths can be reopened by other processes
+    if (isinstance(source, (str, os.PathLike)) and page_count >= PDF_PARALLEL_PAGES
+            and _get_pool() is not None):
+        pages = _iter_page_text_parallel(os.fspath(source), page_count, max_chars)
+    else:
+        pages = _iter_reader_pages(reader, max_pages, max_chars)
+    return "".join(f"{text}\n" for text in pages)
@@ -0,0 +1,104 @@
+import re
+from typing import Dict, List, Tuple
+
+from skill_matcher import SkillMatcher
+
+_DIGIT_RE = re.compile(r"\d")
+
+
+def role_words(role_lower: str, text_lower: str = None) -> List[str]:
+    """Words of a role name that ATS scoring looks for (longer than 3 letters); only those in the text if given"""
+    words = [word for word in role_lower.split() if len(word) > 3]
+    return words if text_lower is None else [word for word in words if word in text_lower]
+
+
+class ResumeFeatures:
+    """Everything sector detection, ATS scoring and skill extraction read from a resume"""
+
+    def __init__(self, sector: str, sections: List[str], has_digits: bool, word_count: int,
+                 role_word_hits: List[str], sector_term_counts: Dict[str, int],
+                 skill_hits: Dict[str, List[int]], text_lower: str = ""):
+        self.sector = sector
+        self.sections = sections
+        self.has_digits = has_digits
+        self.word_count = word_count
+        self.role_word_hits = role_word_hits
+        self.sector_term_counts = sector_term_counts
+        # normalized skill -> start positions in the resume text
+        self.skill_hits = skill_hits
+        # The lowercased resume, for re-targeting at another role (see with_role)
+        self.text_lower = text_lower
+
+
+class ResumeFeatureExtractor:
+    """Normalizes a resume once and pulls every scoring feature out of it"""
+
+    def __init__(self, skill_keywords: Dict[str, List[str]],
+                 sector_terms: List[Tuple[str, List[str]]], sections: List[str]):
+        # sector_terms is ordered: the first sector with a hit wins
+        self.sector_terms = sector_terms
+        self.sections = sections
+        self.skill_norms = {skill.lower() for skills in skill_keywords.values() for skill in skills}
+
+        # Skills and sector indicators share one matcher, so a resume is
+        # scanned once no matter how many lists we check.
+        terms = [skill for skills in skill_keywords.values() for skill in skills]
+        terms += [term for _, sector_list in sector_terms for term in sector_list]
+        self.matcher = SkillMatcher(terms)
+
+    def extract(self, text: str, target_role: str = "") -> ResumeFeatures:
+        text_lower = (text or "").lower()
+        role_lower = (target_role or "").lower()
+
+        hits = self.matcher.scan(text_lower)
+        # The role is short, scan it separately instead of copying the resume
+        role_hits = self.matcher.scan(role_lower)
+
+        sector_term_counts = {}
+        sector = "general"
+        for name, terms in self.sector_terms:
+            count = sum(len(hits.get(term, ())) + len(role_hits.get(term, ())) for term in terms)
+            sector_term_counts[name] = count
+            if count and sector == "general":
+                sector = name
+
+        return ResumeFeatures(
+            sector=sector,
+            # Section names and role words count as substrings ("experienced" has "experience"),
+            # only sector indicators need whole words
+            sections=[section for section in self.sections if section in text_lower],
+            has_digits=_DIGIT_RE.search(text_lower) is not None,
+            word_count=len(text_lower.split()),
+            role_word_hits=role_words(role_lower, text_lower),
+            sector_term_counts=sector_term_counts,
+            skill_hits={norm: positions for norm, positions in hits.items() if norm in self.skill_norms},
+            text_lower=text_lower,
+        )
+
+    def with_role(self, features: ResumeFeatures, target_role: str) -> ResumeFeatures:
+        """Features from extract(text) with no role, as extract(text, target_role) would give them.
+
+        Only the role is scanned, so scoring one resume for many roles reads
+        the resume once.
+        """
+        role_lower = (target_role or "").lower()
+        role_hits = self.matcher.scan(role_lower)
+
+        sector_term_counts = {}
+        sector = "general"
+        for name, terms in self.sector_terms:
+            count = features.sector_term_counts.get(name, 0) + sum(len(role_hits.get(term, ())) for term in terms)
+            sector_term_counts[name] = count
+            if count and sector == "general":
+                sector = name
+
+        return ResumeFeatures(
+            sector=sector,
+            sections=features.sections,
+            has_digits=features.has_digits,
+            word_count=features.word_count,
+            role_word_hits=role_words(role_lower, features.text_lower),
+            sector_term_counts=sector_term_counts,
+            skill_hits=features.skill_hits,
+            text_lower=features.text_lower,
+        )
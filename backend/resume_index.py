@@ -0,0 +1,184 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Bump when the stored layout changes; older stored indexes are rebuilt
+INDEX_VERSION = 1
+# Paragraphs longer than this are split at line breaks into several chunks
+CHUNK_MAX_CHARS = 400
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Keeps "c++", "c#" and "node.js" whole
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_STOP_WORDS = frozenset([
+    "a", "an", "the", "and", "or", "of", "in", "on", "at", "to", "for", "with", "by", "from", "as",
+    "is", "are", "was", "were", "be", "i", "me", "my", "you", "your", "what", "which", "does", "do",
+    "did", "about", "say", "says", "tell", "show", "resume", "cv", "mention", "mentioned", "any", "have",
+])
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        token = token.rstrip(".")
+        # Single letters are noise ("what's" -> "s"), except the C and R languages
+        if (len(token) > 1 or token in ("c", "r")) and token not in _STOP_WORDS:
+            # Cheap plural folding so "projects" finds "project"
+            if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+                token = token[:-1]
+            tokens.append(token)
+    return tokens
+
+
+def chunk_spans(text: str, max_chars: int = CHUNK_MAX_CHARS) -> List[Tuple[int, int]]:
+    """(start, end) of each chunk: blank-line paragraphs, long ones split by lines"""
+    spans = []
+    for match in re.finditer(r"\S(?:.|\n(?!\s*\n))*", text):
+        start, end = match.span()
+        if end - start <= max_chars:
+            spans.append((start, end))
+            continue
+        # PDF text often has no blank lines: group lines up to max_chars
+        chunk_start = line_start = start
+        while line_start < end:
+            line_end = text.find("\n", line_start, end)
+            line_end = end if line_end == -1 else line_end + 1
+            if line_end - chunk_start > max_chars and line_start > chunk_start:
+                spans.append((chunk_start, line_start))
+                chunk_start = line_start
+            line_start = line_end
+        spans.append((chunk_start, end))
+    # End each span on its last visible character
+    trimmed = []
+    for start, end in spans:
+        end = start + len(text[start:end].rstrip())
+        if end > start:
+            trimmed.append((start, end))
+    return trimmed
+
+
+class ResumeIndex:
+    """BM25 index over one resume's chunks.
+
+    Postings are stored term-major (CSR): the chunks containing term t are
+    docs[offsets[t]:offsets[t + 1]] with their precomputed BM25 weights
+    alongside, so a query is a few vectorized adds. The index keeps chunk
+    spans, not text; pass the resume text when reading passages.
+    """
+
+    def __init__(self, spans: List[Tuple[int, int]], terms: List[str], offsets: np.ndarray,
+                 docs: np.ndarray, weights: np.ndarray, chars: int):
+        self.spans = spans
+        self.term_ids = {term: i for i, term in enumerate(terms)}
+        self.terms = terms
+        self.offsets = offsets
+        self.docs = docs
+        self.weights = weights
+        # Length of the text the index was built from, to detect a stale index
+        self.chars = chars
+
+    @classmethod
+    def build(cls, text: str) -> "ResumeIndex":
+        spans = chunk_spans(text)
+        counts = [Counter(tokenize(text[start:end])) for start, end in spans]
+        lengths = np.array([sum(c.values()) for c in counts], dtype=np.float64)
+        avg_length = float(lengths.mean()) if len(lengths) and lengths.sum() else 1.0
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc, term_counts in enumerate(counts):
+            for term, tf in term_counts.items():
+                postings.setdefault(term, []).append((doc, tf))
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int32)
+        docs, tfs, idfs = [], [], []
+        for i, term in enumerate(terms):
+            entries = postings[term]
+            idf = math.log(1 + (len(spans) - len(entries) + 0.5) / (len(entries) + 0.5))
+            for doc, tf in entries:
+                docs.append(doc)
+                tfs.append(tf)
+                idfs.append(idf)
+            offsets[i + 1] = len(docs)
+        docs = np.array(docs, dtype=np.int32)
+        tfs = np.array(tfs, dtype=np.float64)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[docs] / avg_length) if len(docs) else tfs
+        weights = (np.array(idfs) * tfs * (BM25_K1 + 1) / (tfs + norm)).astype(np.float32)
+        return cls(spans, terms, offsets, docs, weights, len(text))
+
+    def search(self, query: str, k: int = 3) -> List[Tuple[int, float]]:
+        """Top-k (chunk number, score) for the query, best first; only chunks that match"""
+        scores = np.zeros(len(self.spans), dtype=np.float32)
+        for term in set(tokenize(query)):
+            i = self.term_ids.get(term)
+            if i is not None:
+                start, end = self.offsets[i], self.offsets[i + 1]
+                # A term occurs once per chunk in its postings, so plain fancy-index add is safe
+                scores[self.docs[start:end]] += self.weights[start:end]
+        hits = np.flatnonzero(scores)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        # Ties go to the earlier chunk
+        order = sorted(hits, key=lambda doc: (-scores[doc], doc))
+        return [(int(doc), float(scores[doc])) for doc in order]
+
+    def match_start(self, text: str, chunk: int, query: str) -> int:
+        """Offset of the chunk's first line that mentions the query (else the chunk start)"""
+        start, end = self.spans[chunk]
+        terms = set(tokenize(query))
+        line_start = start
+        while line_start < end:
+            line_end = text.find("\n", line_start, end)
+            line_end = end if line_end == -1 else line_end
+            if terms.intersection(tokenize(text[line_start:line_end])):
+                return line_start
+            line_start = line_end + 1
+        return start
+
+    def passage(self, text: str, query: str, max_chars: int) -> Optional[str]:
+        """Text from the best-matching line onwards, up to max_chars.
+
+        Starting at the matching line rather than the chunk start puts a
+        section heading in the middle of a chunk at the top of the passage.
+        """
+        hits = self.search(query, k=1)
+        if not hits:
+            return None
+        start = self.match_start(text, hits[0][0], query)
+        return text[start:start + max_chars]
+
+    def to_dict(self) -> Dict:
+        """JSON-ready form, stored with the resume row and in the session"""
+        return {
+            "version": INDEX_VERSION,
+            "chars": self.chars,
+            "spans": [list(span) for span in self.spans],
+            "terms": self.terms,
+            "offsets": self.offsets.tolist(),
+            "docs": self.docs.tolist(),
+            "weights": [round(float(w), 4) for w in self.weights],
+        }
+
+    @staticmethod
+    def is_current(data: Optional[Dict], text: str) -> bool:
+        """True if a stored index has the current layout and was built from this text"""
+        return bool(data) and data.get("version") == INDEX_VERSION and data.get("chars") == len(text)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict], text: str) -> "ResumeIndex":
+        """Load a stored index, or rebuild it if missing or stale"""
+        if not cls.is_current(data, text):
+            return cls.build(text)
+        return cls(
+            [tuple(span) for span in data["spans"]],
+            data["terms"],
+            np.array(data["offsets"], dtype=np.int32),
+            np.array(data["docs"], dtype=np.int32),
+            np.array(data["weights"], dtype=np.float32),
+            data["chars"],
+        )
@@ -0,0 +1,115 @@
+import bisect
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Bump when the stored layout or header list changes; older tables are rebuilt
+SECTIONS_VERSION = 1
+
+# Header wording -> section name. Matched against a whole line (or the part
+# before a colon), lowercased, with "&" read as "and".
+SECTION_HEADERS = {
+    "summary": ["summary", "professional summary", "career summary", "profile", "professional profile",
+                "about me", "personal statement"],
+    "objective": ["objective", "career objective", "professional objective"],
+    "experience": ["experience", "work experience", "professional experience", "relevant experience",
+                   "employment", "employment history", "work history", "career history"],
+    "education": ["education", "academic background", "academic history", "education and training"],
+    "skills": ["skills", "technical skills", "key skills", "core skills", "core competencies", "competencies",
+               "skills and abilities", "skills summary"],
+    "projects": ["projects", "personal projects", "key projects", "academic projects"],
+    "certifications": ["certifications", "certificates", "licenses", "licenses and certifications",
+                       "certifications and licenses"],
+    "training": ["training", "courses", "coursework", "professional development"],
+    "qualification": ["qualifications", "key qualifications", "professional qualifications"],
+    "awards": ["awards", "honors", "honours", "achievements", "key achievements", "awards and honors"],
+    "publications": ["publications"],
+    "languages": ["languages"],
+    "volunteer": ["volunteer experience", "volunteering", "volunteer work"],
+    "interests": ["interests", "hobbies", "hobbies and interests"],
+    "references": ["references"],
+}
+_HEADER_NAMES = {alias: name for name, aliases in SECTION_HEADERS.items() for alias in aliases}
+
+# Leading bullets/rules and a trailing colon around a header's words
+_HEADER_RE = re.compile(r"[^a-z&]*([a-z][a-z &]*?)\s*(:.*)?")
+
+
+def _header_name(line: str) -> Optional[str]:
+    """Section name if the line is a header ("EXPERIENCE", "Skills: Python, SQL")"""
+    match = _HEADER_RE.fullmatch(line.strip().lower())
+    if not match:
+        return None
+    words = " ".join(match.group(1).replace("&", " and ").split())
+    return _HEADER_NAMES.get(words)
+
+
+class ResumeSections:
+    """Span table of a resume's sections: (name, start, end) in text order.
+
+    A section runs from its header line to the next header. Built once per
+    resume, so section questions are a dictionary lookup and a slice.
+    """
+
+    def __init__(self, spans: List[Tuple[str, int, int]], chars: int):
+        self.spans = spans
+        self.starts = [start for _, start, _ in spans]
+        # First occurrence wins when a header repeats
+        self.by_name: Dict[str, Tuple[int, int]] = {}
+        for name, start, end in spans:
+            self.by_name.setdefault(name, (start, end))
+        # Length of the text the table was built from, to detect a stale table
+        self.chars = chars
+
+    @classmethod
+    def build(cls, text: str) -> "ResumeSections":
+        headers = []
+        line_start = 0
+        while line_start < len(text):
+            line_end = text.find("\n", line_start)
+            line_end = len(text) if line_end == -1 else line_end
+            line = text[line_start:line_end]
+            name = _header_name(line)
+            if name:
+                # Skip the indent so the slice starts on the header itself
+                headers.append((name, line_start + len(line) - len(line.lstrip())))
+            line_start = line_end + 1
+        spans = []
+        for i, (name, start) in enumerate(headers):
+            end = headers[i + 1][1] if i + 1 < len(headers) else len(text)
+            spans.append((name, start, start + len(text[start:end].rstrip())))
+        return cls(spans, len(text))
+
+    def names(self) -> List[str]:
+        """Section names in the order they first appear"""
+        return list(self.by_name)
+
+    def section(self, text: str, name: str) -> Optional[str]:
+        span = self.by_name.get(name)
+        return text[span[0]:span[1]] if span else None
+
+    def section_at(self, offset: int) -> Optional[str]:
+        """Name of the section containing a text offset"""
+        i = bisect.bisect_right(self.starts, offset) - 1
+        if i >= 0 and offset < self.spans[i][2]:
+            return self.spans[i][0]
+        return None
+
+    def to_dict(self) -> Dict:
+        """JSON-ready form, stored with the resume row and in the session"""
+        return {
+            "version": SECTIONS_VERSION,
+            "chars": self.chars,
+            "spans": [list(span) for span in self.spans],
+        }
+
+    @staticmethod
+    def is_current(data: Optional[Dict], text: str) -> bool:
+        """True if a stored table has the current layout and was built from this text"""
+        return bool(data) and data.get("version") == SECTIONS_VERSION and data.get("chars") == len(text)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict], text: str) -> "ResumeSections":
+        """Load a stored table, or rebuild it if missing or stale"""
+        if not cls.is_current(data, text):
+            return cls.build(text)
+        return cls([tuple(span) for span in data["spans"]], data["chars"])
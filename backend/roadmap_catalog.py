@@ -0,0 +1,58 @@
+import os
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
+
+from knowledge_base import get_knowledge_base
+
+ROADMAP_WEEKS = 4
+ROADMAP_CACHE_SIZE = int(os.getenv("ROADMAP_CACHE_SIZE", "1024"))
+
+# (week label, topic, resources) per week
+RoadmapTemplate = Tuple[Tuple[str, str, Tuple[str, ...]], ...]
+
+
+@lru_cache(maxsize=ROADMAP_CACHE_SIZE)
+def roadmap_template(skills: Tuple[str, ...], weeks: int = ROADMAP_WEEKS) -> RoadmapTemplate:
+    """Immutable week plan for a skill tuple; cached, so never mutate the result"""
+    kb = get_knowledge_base()
+    template = []
+    for i in range(weeks):
+        skill = skills[i % len(skills)]
+        if i >= len(skills):
+            topic = "Review & Practice"
+        elif i == 0:
+            topic = f"{skill} Fundamentals"
+        elif i == 1:
+            topic = f"{skill} Practice"
+        elif i == 2:
+            topic = f"Advanced {skill}"
+        else:
+            topic = "Integration & Review"
+        template.append((f"Week {i+1}", topic, kb.resources(skill)[:3]))
+    return tuple(template)
+
+
+def build_roadmap(skills: Sequence[str], weeks: int = ROADMAP_WEEKS) -> Dict[str, Dict]:
+    """Fresh roadmap dict for the given skills, safe for callers to edit"""
+    # Only the first `weeks` skills can appear in the plan, so they are the key
+    key = tuple(skill.strip() for skill in skills[:weeks]) or ("Professional Development",)
+    return {
+        week: {"topic": topic, "resources": list(resources)}
+        for week, topic, resources in roadmap_template(key, weeks)
+    }
+
+
+def clear_cache():
+    """Drop memoized plans, e.g. after the knowledge base reloads"""
+    roadmap_template.cache_clear()
+
+
+def cache_stats() -> Dict[str, float]:
+    info = roadmap_template.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "hit_rate": round(info.hits / lookups, 3) if lookups else 0.0,
+    }
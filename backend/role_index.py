@@ -0,0 +1,46 @@
+import re
+from typing import Dict, Optional, Sequence
+
+from skill_matcher import trie_pattern
+
+_SEPARATOR_RE = re.compile(r"[^a-z0-9+#.]+")
+
+
+def role_key(role: str) -> str:
+    """Lowercase and collapse separators: "Full-Stack  Developer" -> "full stack developer" """
+    return _SEPARATOR_RE.sub(" ", (role or "").lower()).strip()
+
+
+class RoleIndex:
+    """Longest-match lookup of a target role against known role names.
+
+    A name matches when it appears anywhere in the role (so "physio" still
+    covers "physiotherapy student"). Among matches the longest name wins,
+    then the earliest one, so "registered nurse" beats "nurse".
+    One compiled scan per lookup, however many roles are loaded.
+    """
+
+    def __init__(self, names: Sequence[str]):
+        # normalized name -> position in the table, for tie-breaking
+        self._rank: Dict[str, int] = {}
+        for name in names:
+            key = role_key(name)
+            if key and key not in self._rank:
+                self._rank[key] = len(self._rank)
+        self._pattern = re.compile("(?=(" + trie_pattern(list(self._rank)) + "))") if self._rank else None
+
+    def __len__(self) -> int:
+        return len(self._rank)
+
+    def match(self, role: str) -> Optional[str]:
+        """Normalized name of the best matching role, or None"""
+        key = role_key(role)
+        if key in self._rank:
+            return key
+        if self._pattern is None:
+            return None
+        # At each position the pattern yields the longest name starting there
+        found = self._pattern.findall(key)
+        if not found:
+            return None
+        return min(found, key=lambda name: (-len(name), self._rank[name]))
@@ -0,0 +1,115 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from resume_features import ResumeFeatureExtractor, ResumeFeatures, role_words as name_words
+from skill_matcher import SkillMatcher
+
+
+class RoleScorer:
+    """Scores one resume against every known role at once.
+
+    Built from the catalog: the (role, skill) pairs of required skills, the
+    (role, word) pairs of the words in role names and each role's own
+    sector-term counts. Scoring scans the resume once into presence vectors,
+    then every role's ATS score and skill coverage is a sparse sum over the
+    pairs, so memory grows with the number of requirements rather than with
+    roles times skills. The ATS score is the same number calculate_ats_score
+    gives for that role.
+    """
+
+    def __init__(self, role_skills: Dict[str, Sequence[str]], skill_keywords: Dict[str, List[str]],
+                 extractor: ResumeFeatureExtractor):
+        # Roles by display name ("Project Manager"); results carry the same names
+        self.roles = list(role_skills)
+        self.required = [list(skills) for skills in role_skills.values()]
+        self.sectors = [name for name, _ in extractor.sector_terms] + ["general"]
+        # Sector skills as normalized names, to count a resume's matches per sector
+        self.sector_skills = [[skill.lower() for skill in skill_keywords.get(sector, [])] for sector in self.sectors]
+
+        skills = list(dict.fromkeys(skill.strip().lower() for required in self.required for skill in required))
+        # calculate_ats_score counts words longer than 3 letters of the role name
+        role_words = [name_words(role.lower()) for role in self.roles]
+        words = list(dict.fromkeys(word for row in role_words for word in row))
+        self.skill_ids = {skill: i for i, skill in enumerate(skills)}
+        self.word_ids = {word: i for i, word in enumerate(words)}
+
+        # (role, column) pairs, one row per distinct required skill and per role-name word
+        skill_pairs = np.array([(r, self.skill_ids[skill]) for r, required in enumerate(self.required)
+                                for skill in dict.fromkeys(skill.strip().lower() for skill in required)],
+                               dtype=np.int32).reshape(-1, 2)
+        word_pairs = np.array([(r, self.word_ids[word]) for r, row in enumerate(role_words) for word in row],
+                              dtype=np.int32).reshape(-1, 2)
+        self.skill_rows, self.skill_cols = skill_pairs[:, 0], skill_pairs[:, 1]
+        self.word_rows, self.word_cols = word_pairs[:, 0], word_pairs[:, 1]
+        self.sector_matrix = np.zeros((len(self.roles), len(self.sectors)), dtype=np.int32)
+        for r, role in enumerate(self.roles):
+            # Sector terms in the role name itself, exactly as a target role is scanned
+            counts = extractor.extract("", role).sector_term_counts
+            self.sector_matrix[r, :-1] = [counts[name] for name in self.sectors[:-1]]
+        self.required_counts = np.maximum(np.bincount(self.skill_rows, minlength=len(self.roles)), 1)
+
+        # Required skills need whole-word hits; role-name words are substring checks (see score)
+        self.matcher = SkillMatcher(skills)
+
+    def __len__(self) -> int:
+        return len(self.roles)
+
+    def score(self, text: str, features: ResumeFeatures, limit: Optional[int] = None) -> List[Dict]:
+        """Roles ranked by required-skill coverage, then ATS score; features from extract(text) with no role"""
+        text_lower = (text or "").lower()
+        skill_vector = np.zeros(len(self.skill_ids), dtype=np.float32)
+        word_vector = np.zeros(len(self.word_ids), dtype=np.float32)
+        for term in self.matcher.scan(text_lower):
+            if term in self.skill_ids:
+                skill_vector[self.skill_ids[term]] = 1
+        for word, i in self.word_ids.items():
+            if word in text_lower:
+                word_vector[i] = 1
+
+        # Parts of calculate_ats_score that do not depend on the role
+        sections = 4 * len(features.sections)
+        achievements = 8 if features.has_digits else 0
+        length = 8 if 300 <= features.word_count <= 1000 else 4 if features.word_count > 1000 else 0
+        base = 50 + sections + achievements + length
+
+        # Sector per role: the first sector with a hit in the resume or the role name
+        text_counts = np.array([features.sector_term_counts.get(name, 0) for name in self.sectors], dtype=np.int32)
+        has_term = (self.sector_matrix + text_counts) > 0
+        sector_ids = np.where(has_term.any(axis=1), has_term.argmax(axis=1), len(self.sectors) - 1)
+        sector_matches = np.array([sum(1 for skill in skills if skill in features.skill_hits)
+                                   for skills in self.sector_skills])
+        sector_points = np.minimum(15, 3 * sector_matches[sector_ids])
+        role_words = np.bincount(self.word_rows, weights=word_vector[self.word_cols], minlength=len(self.roles))
+        role_points = 4 * role_words.astype(np.int32)
+        ats_scores = np.clip(base + role_points + sector_points, 35, 95)
+
+        matched_counts = np.bincount(self.skill_rows, weights=skill_vector[self.skill_cols], minlength=len(self.roles))
+        coverage = matched_counts / self.required_counts
+        # Best coverage first, then ATS score, then catalog order
+        order = np.lexsort((np.arange(len(self.roles)), -ats_scores, -coverage))
+        if limit is not None:
+            order = order[:limit]
+
+        ranked = []
+        for r in order:
+            matched, missing = [], []
+            for skill in self.required[r]:
+                (matched if skill_vector[self.skill_ids[skill.strip().lower()]] else missing).append(skill)
+            ranked.append({
+                "role": self.roles[r],
+                "match_percent": int(round(100 * float(coverage[r]))),
+                "ats_score": int(ats_scores[r]),
+                "matched_skills": matched,
+                "missing_skills": missing,
+                "breakdown": {
+                    "base": 50,
+                    "sections": sections,
+                    "achievements": achievements,
+                    "length": length,
+                    "role_keywords": int(role_points[r]),
+                    "sector": self.sectors[sector_ids[r]],
+                    "sector_skills": int(sector_points[r]),
+                },
+            })
+        return ranked
@@ -1,82 +1,202 @@
-from fastapi import APIRouter, HTTPException
-from shared_ai import shared_ai_engine
-from database import save_chat_message, get_chat_history, get_user_resume_content, save_roadmap, get_latest_roadmap
-from models import ChatRequest, ChatResponse
+import asyncio
+import copy
+import json
+import anyio
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from shared_ai import ensure_engine, shared_ai_engine
+from rag_engine import CHAT_TOPIC_WINDOW
+from database_async import get_user_resume_content, save_roadmap, get_latest_roadmap
+from chat_writer import chat_writer, utc_now
+from models import CachePreferenceRequest, ChatRequest, ChatResponse
+from concurrency import run_cpu, run_io
+from session_store import SessionConflict, UserSession
 
-router = APIRouter(prefix="/chat", tags=["chat"])
+router = APIRouter(prefix="/chat", tags=["chat"], dependencies=[Depends(ensure_engine)])
+
+async def _skip():
+    return None
+
+async def _load_turn_context(user_id: str):
+    """Fetch what a chat turn needs; rebuilds the session of a new or evicted user"""
+    sessions = shared_ai_engine.sessions
+    # Session store calls can be SQLite I/O (SESSION_BACKEND=sqlite): keep them off the loop
+    session = await run_io(sessions.get, user_id)
+    needs_session = session is None
+    # A warm session already carries the conversation's topic state
+    needs_history = needs_session or not session.history_loaded
+    
+    # Fetch stage: resume, roadmap and history are independent reads
+    resume_context, db_roadmap, chat_history = await asyncio.gather(
+        get_user_resume_content(user_id),
+        get_latest_roadmap(user_id) if needs_session else _skip(),
+        chat_writer.get_chat_history(user_id, limit=CHAT_TOPIC_WINDOW) if needs_history else _skip()
+    )
+    
+    # New or evicted user: rebuild their session from the database
+    if needs_session:
+        session = await run_cpu(shared_ai_engine.session_from_db, resume_context, db_roadmap)
+        if session:
+            await run_io(sessions.put, user_id, session, force=True)
+    return resume_context, chat_history
+
+async def _run_turn(engine_fn, request: ChatRequest, resume_context, chat_history):
+    """Run a chat turn on the engine pool; returns (result, roadmap before the turn).
+
+    If another worker edited the session while we worked on it, our write is
+    rejected: redo the turn once on the fresh copy instead of clobbering theirs.
+    """
+    sessions = shared_ai_engine.sessions
+    for attempt in range(2):
+        session = await run_io(sessions.get, request.user_id)
+        old_roadmap_str = str(session.roadmap) if session else "{}"
+        try:
+            result = await run_cpu(
+                engine_fn,
+                user_id=request.user_id,
+                message=request.message,
+                resume_context=resume_context,
+                chat_history=chat_history
+            )
+            return result, old_roadmap_str
+        except SessionConflict:
+            if attempt:
+                raise HTTPException(status_code=409, detail="Session was updated concurrently, please retry")
+            session = await run_io(sessions.get, request.user_id)
+            if chat_history is None and not (session and session.history_loaded):
+                chat_history = await chat_writer.get_chat_history(request.user_id, limit=CHAT_TOPIC_WINDOW)
+
+async def _roadmap_change(user_id: str, old_roadmap_str: str, background_tasks: BackgroundTasks) -> bool:
+    """Save the roadmap after the response is sent if the turn modified it"""
+    session = await run_io(shared_ai_engine.sessions.get, user_id)
+    new_roadmap = session.roadmap if session else {}
+    roadmap_modified = bool(new_roadmap) and str(new_roadmap) != old_roadmap_str
+    if roadmap_modified:
+        goal = (session.roadmap_goal if session else "") or "Learning Path"
+        background_tasks.add_task(save_roadmap, user_id, goal, copy.deepcopy(new_roadmap))
+    return roadmap_modified
+
+def _save_messages(user_id: str, message: str, response: str, received_at: str):
+    # Write stage: messages go to the write-behind buffer, which bulk-inserts
+    # across users. Explicit timestamps keep the user/assistant order.
+    chat_writer.enqueue([
+        {"user_id": user_id, "role": "user", "content": message, "created_at": received_at},
+        {"user_id": user_id, "role": "assistant", "content": response, "created_at": utc_now()}
+    ])
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 @router.post("/message", response_model=ChatResponse)
-async def send_message(request: ChatRequest):
+async def send_message(request: ChatRequest, background_tasks: BackgroundTasks):
     try:
-        # Get user's resume context from database
-        resume_context = get_user_resume_content(request.user_id)
-        
-        # If we have resume context, load it into AI memory
-        if resume_context and request.user_id not in shared_ai_engine.user_data:
-            # Initialize user data from database
-            shared_ai_engine.user_data[request.user_id] = {
-                "resume_text": resume_context.get("resume_content", ""),
-                "target_role": resume_context.get("target_role", ""),
-                "sector": shared_ai_engine._detect_sector(
-                    resume_context.get("resume_content", ""),
-                    resume_context.get("target_role", "")
-                ),
-                "skills_have": [],
-                "skills_need": [],
-                "roadmap": {},
-                "roadmap_goal": resume_context.get("target_role", "")
-            }
-            # Also try to load latest roadmap from DB
-            db_roadmap = get_latest_roadmap(request.user_id)
-            if db_roadmap:
-                shared_ai_engine.user_data[request.user_id]["roadmap"] = db_roadmap.get("roadmap_json", {})
-                shared_ai_engine.user_data[request.user_id]["roadmap_goal"] = db_roadmap.get("title", "")
-        
-        # Get chat history for context
-        chat_history = get_chat_history(request.user_id, limit=10)
-        
-        # Get current roadmap state before chat
-        old_roadmap = shared_ai_engine.user_data.get(request.user_id, {}).get("roadmap", {})
-        old_roadmap_str = str(old_roadmap)
-        
-        # Save user message
-        save_chat_message(request.user_id, "user", request.message)
+        received_at = utc_now()
+        resume_context, chat_history = await _load_turn_context(request.user_id)
         
         # Generate AI response with context
-        response = shared_ai_engine.chat_with_context(
-            user_id=request.user_id,
-            message=request.message,
-            resume_context=resume_context,
-            chat_history=chat_history
+        (response, intent), old_roadmap_str = await _run_turn(
+            shared_ai_engine.chat_with_intent, request, resume_context, chat_history
         )
         
         # Check if roadmap was modified during chat
-        new_roadmap = shared_ai_engine.user_data.get(request.user_id, {}).get("roadmap", {})
-        roadmap_modified = str(new_roadmap) != old_roadmap_str and new_roadmap
-        
-        # If roadmap was modified, save to database
-        if roadmap_modified:
-            goal = shared_ai_engine.user_data.get(request.user_id, {}).get("roadmap_goal", "Learning Path")
-            save_roadmap(request.user_id, goal, new_roadmap)
-        
-        # Save AI response
-        save_chat_message(request.user_id, "assistant", response)
+        roadmap_modified = await _roadmap_change(request.user_id, old_roadmap_str, background_tasks)
+        _save_messages(request.user_id, request.message, response, received_at)
         
         return {
             "response": response,
             "context_used": resume_context is not None,
-            "roadmap_updated": roadmap_modified
+            "roadmap_updated": roadmap_modified,
+            "intent": intent
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in chat endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/message/stream")
+async def stream_message(request: ChatRequest, background_tasks: BackgroundTasks):
+    """Like /message, but the reply is sent as Server-Sent Events while it is generated.
+
+    Events: `meta` (intent, context_used, roadmap_updated) first, then one
+    `token` per reply segment, then `done` with the full reply once the
+    messages are queued for saving, or `error` if generation failed.
+    """
+    try:
+        received_at = utc_now()
+        resume_context, chat_history = await _load_turn_context(request.user_id)
+        # Routing and rule-based replies finish here; model replies stream below
+        (intent, segments), old_roadmap_str = await _run_turn(
+            shared_ai_engine.stream_chat, request, resume_context, chat_history
+        )
+        roadmap_modified = await _roadmap_change(request.user_id, old_roadmap_str, background_tasks)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in chat stream endpoint: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def events():
+        parts = []
+        step = None
+        finished = False
+        try:
+            yield _sse("meta", {"intent": intent, "context_used": resume_context is not None,
+                                "roadmap_updated": roadmap_modified})
+            # Each step of the generator blocks on the model, so it runs off the loop
+            while True:
+                # Shielded: a step cut short by a disconnect still completes, so close() below can run
+                step = asyncio.ensure_future(run_io(next, segments, None))
+                segment = await asyncio.shield(step)
+                if segment is None:
+                    finished = True
+                    break
+                parts.append(segment)
+                yield _sse("token", {"text": segment})
+        except Exception as e:
+            print(f"Error streaming chat reply: {e}")
+            yield _sse("error", {"detail": str(e)})
+            return
+        finally:
+            if not finished and hasattr(segments, "close"):
+                # Client gone or stream failed: give back the model slot and upstream
+                # connection now rather than when the generator is garbage collected
+                with anyio.CancelScope(shield=True):
+                    if step is not None and not step.done():
+                        await asyncio.wait([step])
+                    try:
+                        await run_io(segments.close)
+                    except Exception as e:
+                        print(f"Error closing chat reply stream: {e}")
+        response = "".join(parts).strip()
+        # Persist only once the whole reply is out
+        _save_messages(request.user_id, request.message, response, received_at)
+        yield _sse("done", {"response": response})
+    
+    # Roadmap saves (background_tasks) run after the stream ends
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @router.get("/history/{user_id}")
 async def get_history(user_id: str):
     try:
-        history = get_chat_history(user_id, limit=50)
+        history = await chat_writer.get_chat_history(user_id, limit=50)
         return {"messages": history}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.put("/cache-preference/{user_id}")
+async def set_cache_preference(user_id: str, request: CachePreferenceRequest):
+    """Opt a user in or out of shared caching of model replies"""
+    try:
+        await run_io(shared_ai_engine.llm_cache.set_opt_out, user_id, request.opt_out)
+        return {"user_id": user_id, "opt_out": request.opt_out}
+    except HTTPException:
+        raise
     except Exception as e:
+        print(f"Error saving cache preference: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/roadmap/{user_id}")
@@ -84,24 +204,23 @@ async def get_user_roadmap_from_session(user_id: str):
     """Get the current roadmap from AI session (includes chat modifications)"""
     try:
         # First check AI memory for latest roadmap
-        session_roadmap = shared_ai_engine.user_data.get(user_id, {}).get("roadmap", {})
-        goal = shared_ai_engine.user_data.get(user_id, {}).get("roadmap_goal", "Learning Path")
+        session = await run_io(shared_ai_engine.sessions.get, user_id)
         
-        if session_roadmap:
+        if session and session.roadmap:
             return {
-                "roadmap": session_roadmap,
-                "goal": goal,
+                "roadmap": session.roadmap,
+                "goal": session.roadmap_goal or "Learning Path",
                 "source": "session"
             }
         
         # Fall back to database
-        db_roadmap = get_latest_roadmap(user_id)
+        db_roadmap = await get_latest_roadmap(user_id)
         if db_roadmap:
             # Also load into AI memory for future chat
-            if user_id not in shared_ai_engine.user_data:
-                shared_ai_engine.user_data[user_id] = {}
-            shared_ai_engine.user_data[user_id]["roadmap"] = db_roadmap.get("roadmap_json", {})
-            shared_ai_engine.user_data[user_id]["roadmap_goal"] = db_roadmap.get("title", "")
+            session = session or UserSession()
+            session.roadmap = db_roadmap.get("roadmap_json", {})
+            session.roadmap_goal = db_roadmap.get("title", "")
+            await run_io(shared_ai_engine.sessions.put, user_id, session, force=True)
             
             return {
                 "roadmap": db_roadmap.get("roadmap_json", {}),
@@ -113,6 +232,8 @@ async def get_user_roadmap_from_session(user_id: str):
             }
         
         return {"roadmap": {}, "goal": "", "source": "none"}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching roadmap: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -122,24 +243,14 @@ async def load_user_context(user_id: str):
     """Load user context from database into AI memory"""
     try:
         # Load resume
-        resume_context = get_user_resume_content(user_id)
+        resume_context = await get_user_resume_content(user_id)
         
         # Load roadmap
-        db_roadmap = get_latest_roadmap(user_id)
+        db_roadmap = await get_latest_roadmap(user_id)
         
-        if resume_context or db_roadmap:
-            shared_ai_engine.user_data[user_id] = {
-                "resume_text": resume_context.get("resume_content", "") if resume_context else "",
-                "target_role": resume_context.get("target_role", "") if resume_context else (db_roadmap.get("title", "") if db_roadmap else ""),
-                "sector": shared_ai_engine._detect_sector(
-                    resume_context.get("resume_content", "") if resume_context else "",
-                    resume_context.get("target_role", "") if resume_context else ""
-                ) if resume_context else "general",
-                "skills_have": [],
-                "skills_need": [],
-                "roadmap": db_roadmap.get("roadmap_json", {}) if db_roadmap else {},
-                "roadmap_goal": db_roadmap.get("title", "") if db_roadmap else ""
-            }
+        session = await run_cpu(shared_ai_engine.session_from_db, resume_context, db_roadmap)
+        if session:
+            await run_io(shared_ai_engine.sessions.put, user_id, session, force=True)
             return {
                 "success": True,
                 "loaded": {
@@ -148,6 +259,8 @@ async def load_user_context(user_id: str):
                 }
             }
         return {"success": False, "message": "No context found for user"}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error loading context: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,13 +1,64 @@
+import io
 import os
+import json
 import shutil
+import hashlib
 import tempfile
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from shared_ai import shared_ai_engine
-from database import save_resume_analysis, get_user_resume_history, get_resume_by_id, save_roadmap
+import threading
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from shared_ai import ensure_engine, shared_ai_engine
+from database_async import save_resume_analysis, get_user_resume_history, get_resume_by_id, save_roadmap, get_user_resume_content
 from models import ResumeAnalysisResponse
-from typing import List
+from concurrency import run_cpu, run_io
+from batch_analysis import (ARCHIVE_SUFFIXES, BATCH_MAX_BYTES, BATCH_MAX_PDF_BYTES, BatchBudget, BatchTooLarge,
+                            batch_slot, copy_capped, parse_roles, run_batch, unpack_archive)
+from typing import List, Optional
 
-router = APIRouter(prefix="/resume", tags=["resume"])
+router = APIRouter(prefix="/resume", tags=["resume"], dependencies=[Depends(ensure_engine)])
+
+# Uploads larger than this are rejected with 413
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+# Uploads up to this size are parsed from memory; larger ones are spooled to a temp file
+UPLOAD_MEMORY_BYTES = int(os.getenv("UPLOAD_MEMORY_BYTES", str(4 * 1024 * 1024)))
+
+def _too_large():
+    return HTTPException(status_code=413, detail=f"File too large (limit {UPLOAD_MAX_BYTES / (1024 * 1024):g} MB)")
+
+def _spool_upload(source):
+    """Read an upload, hashing it on the way for the analysis cache.
+
+    Returns (BytesIO, hash) for uploads up to UPLOAD_MEMORY_BYTES, else
+    (temp file path, hash); the caller removes the temp file.
+    """
+    digest = hashlib.sha256()
+    buffer = io.BytesIO()
+    tmp = None
+    size = 0
+    try:
+        for block in iter(lambda: source.read(1024 * 1024), b""):
+            size += len(block)
+            if size > UPLOAD_MAX_BYTES:
+                raise _too_large()
+            digest.update(block)
+            if tmp is None and size > UPLOAD_MEMORY_BYTES:
+                tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
+                tmp.write(buffer.getbuffer())
+                buffer = None
+            if tmp is None:
+                buffer.write(block)
+            else:
+                tmp.write(block)
+    except BaseException:
+        if tmp is not None:
+            tmp.close()
+            os.remove(tmp.name)
+        raise
+    if tmp is not None:
+        tmp.close()
+        return tmp.name, digest.hexdigest()
+    buffer.seek(0)
+    return buffer, digest.hexdigest()
 
 @router.post("/analyze")
 async def analyze_resume(
@@ -19,20 +70,23 @@ async def analyze_resume(
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        shutil.copyfileobj(file.file, tmp)
-        tmp_path = tmp.name
+    # The multipart parser already knows the size; don't read what would be rejected
+    if file.size is not None and file.size > UPLOAD_MAX_BYTES:
+        raise _too_large()
+    pdf_source, content_hash = await run_io(_spool_upload, file.file)
 
     try:
-        # Run AI Analysis - this also generates roadmap and stores in user_data
-        analysis_result = shared_ai_engine.analyze_resume(tmp_path, target_role, user_id)
+        # Run AI Analysis - this also generates roadmap and stores the user session
+        analysis_result = await run_cpu(
+            shared_ai_engine.analyze_resume, pdf_source, target_role, user_id, content_hash=content_hash
+        )
         
         # Extract resume content and roadmap for DB storage
         resume_content = analysis_result.get("resume_content", "")
         roadmap = analysis_result.get("roadmap", {})
         
         # Save resume analysis to Supabase (this creates history)
-        save_resume_analysis(
+        await save_resume_analysis(
             user_id=user_id,
             role=target_role,
             data={
@@ -41,12 +95,14 @@ async def analyze_resume(
                 "skills_you_need": analysis_result.get("skills_you_need", [])
             },
             resume_content=resume_content,
-            ats_score=analysis_result.get("ats_score", 0)
+            ats_score=analysis_result.get("ats_score", 0),
+            resume_index=analysis_result.get("resume_index"),
+            resume_sections=analysis_result.get("resume_sections")
         )
         
         # Also save the auto-generated roadmap
         if roadmap:
-            save_roadmap(user_id, target_role, roadmap)
+            await save_roadmap(user_id, target_role, roadmap)
         
         return {
             "ats_score": analysis_result.get("ats_score", 0),
@@ -54,18 +110,139 @@ async def analyze_resume(
             "skills_you_need": analysis_result.get("skills_you_need", []),
             "roadmap_generated": bool(roadmap)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in analyze_resume endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
     finally:
-        os.remove(tmp_path)
+        if isinstance(pdf_source, str):
+            os.remove(pdf_source)
+
+def _batch_cleanup(workdir: str):
+    """Removes workdir and frees the batch slot, once, whichever caller gets there first"""
+    done = threading.Lock()
+
+    def cleanup():
+        if done.acquire(blocking=False):
+            shutil.rmtree(workdir, ignore_errors=True)
+            batch_slot.release()
+    return cleanup
+
+class _BatchResponse(StreamingResponse):
+    """StreamingResponse that always runs its cleanup.
+
+    The body generator's own finally only runs once it has started; a
+    response cancelled or disconnected before the first line never starts it.
+    """
+
+    def __init__(self, content, cleanup, **kwargs):
+        super().__init__(content, **kwargs)
+        self.cleanup = cleanup
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.cleanup()
+
+def _spool_batch(files: List[UploadFile], workdir: str):
+    """Copy uploaded PDFs and archives into workdir; (name, path) of every PDF.
+
+    Uploads and unpacked PDFs share one BatchBudget, so the batch stops with
+    BatchTooLarge as soon as it goes over the file or byte limits.
+    """
+    budget = BatchBudget()
+    pdfs = []
+    for number, upload in enumerate(files):
+        is_pdf = upload.filename.lower().endswith(".pdf")
+        # Keeps the upload's suffix (.zip, .tar, .gz, .tgz); tarfile detects the compression itself
+        path = os.path.join(workdir, f"upload-{number}" + (".pdf" if is_pdf else os.path.splitext(upload.filename)[1]))
+        if is_pdf:
+            budget.add_file(upload.filename)
+        copy_capped(upload.file, path, BATCH_MAX_PDF_BYTES if is_pdf else None, budget)
+        if is_pdf:
+            pdfs.append((os.path.basename(upload.filename), path))
+        else:
+            pdfs += unpack_archive(path, workdir, budget)
+    return pdfs
+
+@router.post("/analyze-batch")
+async def analyze_resume_batch(
+    files: List[UploadFile] = File(...),
+    target_roles: str = Form(...),
+    user_id: Optional[str] = Form(None)
+):
+    """Analyze many PDFs (or .zip/.tar archives of them) against several roles.
+
+    Streams JSONL: one line per (resume, role) as they finish, then a summary
+    line with the throughput. With a user_id the results are also saved.
+    """
+    roles = parse_roles(target_roles)
+    if not roles:
+        raise HTTPException(status_code=400, detail="At least one target role is required")
+    for file in files:
+        if not file.filename.lower().endswith((".pdf",) + ARCHIVE_SUFFIXES):
+            raise HTTPException(status_code=400, detail="Only PDF files and .zip/.tar archives are allowed")
+    if not batch_slot.acquire(blocking=False):
+        raise HTTPException(status_code=503, detail="A batch is already running, please retry shortly",
+                            headers={"Retry-After": "30"})
+
+    workdir = tempfile.mkdtemp(prefix="resume-batch-")
+    cleanup = _batch_cleanup(workdir)
+    try:
+        # The multipart parser already knows the sizes; don't copy what would be rejected
+        if sum(file.size or 0 for file in files) > BATCH_MAX_BYTES:
+            raise BatchTooLarge(f"Batch larger than {BATCH_MAX_BYTES / (1024 * 1024):g} MB")
+        pdfs = await run_io(_spool_batch, files, workdir)
+        if not pdfs:
+            raise HTTPException(status_code=400, detail="No PDF files found in the upload")
+    except Exception as e:
+        cleanup()
+        if isinstance(e, HTTPException):
+            raise
+        if isinstance(e, BatchTooLarge):
+            raise HTTPException(status_code=413, detail=str(e))
+        print(f"Error in analyze_resume_batch endpoint: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def stream():
+        try:
+            for record in run_batch(pdfs, roles, user_id):
+                yield json.dumps(record) + "\n"
+        finally:
+            # Frees the slot as soon as the batch ends, before the response is done
+            cleanup()
+
+    return _BatchResponse(stream(), cleanup, media_type="application/x-ndjson")
+
+@router.get("/role-fit/{user_id}")
+async def get_role_fit(user_id: str, limit: Optional[int] = Query(None, ge=1)):
+    """Rank every known role by how well the user's latest resume fits it."""
+    try:
+        session = await run_io(shared_ai_engine.sessions.get, user_id)
+        resume_text = session.resume_text if session else ""
+        if not resume_text:
+            resume = await get_user_resume_content(user_id)
+            resume_text = (resume or {}).get("resume_content") or ""
+        if not resume_text:
+            raise HTTPException(status_code=404, detail="No resume found for this user")
+        roles = await run_cpu(shared_ai_engine.score_roles, resume_text, limit)
+        return {"roles": roles}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in get_role_fit endpoint: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/history/{user_id}")
 async def get_resume_history(user_id: str):
     """Get all resume analyses for a user (history)."""
     try:
-        history = get_user_resume_history(user_id)
+        history = await get_user_resume_history(user_id)
         return {"history": history}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching resume history: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -74,7 +251,7 @@ async def get_resume_history(user_id: str):
 async def get_resume_detail(resume_id: str):
     """Get a specific resume analysis by ID."""
     try:
-        resume = get_resume_by_id(resume_id)
+        resume = await get_resume_by_id(resume_id)
         if not resume:
             raise HTTPException(status_code=404, detail="Resume not found")
         return resume
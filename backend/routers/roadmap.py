@@ -1,11 +1,19 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import List
-from shared_ai import shared_ai_engine
-from database import save_roadmap, get_user_roadmaps, get_latest_roadmap, update_roadmap_progress
+from shared_ai import ensure_engine, shared_ai_engine
+from database_async import save_roadmap, get_user_roadmaps, get_latest_roadmap, update_roadmap_progress
 from models import RoadmapRequest, RoadmapResponse
+from concurrency import run_cpu, run_io
 
-router = APIRouter(prefix="/roadmap", tags=["roadmap"])
+router = APIRouter(prefix="/roadmap", tags=["roadmap"], dependencies=[Depends(ensure_engine)])
+
+def _remember_roadmap(user_id: str, roadmap: dict, goal: str):
+    """Put a roadmap into the user's session; blocking with SESSION_BACKEND=sqlite, so run it via run_io"""
+    session = shared_ai_engine.sessions.get_or_create(user_id)
+    session.roadmap = roadmap
+    session.roadmap_goal = goal
+    shared_ai_engine.sessions.put(user_id, session, force=True)
 
 class ProgressUpdate(BaseModel):
     roadmap_id: str
@@ -16,17 +24,16 @@ class ProgressUpdate(BaseModel):
 async def generate_roadmap(request: RoadmapRequest):
     """Generate a new learning roadmap."""
     try:
-        roadmap_json = shared_ai_engine.generate_roadmap(request.skills, request.goal)
+        roadmap_json = await run_cpu(shared_ai_engine.generate_roadmap, request.skills, request.goal)
         
         # Store in AI memory
-        if request.user_id not in shared_ai_engine.user_data:
-            shared_ai_engine.user_data[request.user_id] = {}
-        shared_ai_engine.user_data[request.user_id]["roadmap"] = roadmap_json
-        shared_ai_engine.user_data[request.user_id]["roadmap_goal"] = request.goal
+        await run_io(_remember_roadmap, request.user_id, roadmap_json, request.goal)
         
         # Save to database
-        save_roadmap(request.user_id, request.goal, roadmap_json)
+        await save_roadmap(request.user_id, request.goal, roadmap_json)
         return {"roadmap": roadmap_json}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in generate_roadmap endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -35,8 +42,10 @@ async def generate_roadmap(request: RoadmapRequest):
 async def get_roadmaps(user_id: str):
     """Get all roadmaps for a user."""
     try:
-        roadmaps = get_user_roadmaps(user_id)
+        roadmaps = await get_user_roadmaps(user_id)
         return {"roadmaps": roadmaps}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -44,16 +53,15 @@ async def get_roadmaps(user_id: str):
 async def get_user_latest_roadmap(user_id: str):
     """Get user's most recent roadmap."""
     try:
-        roadmap = get_latest_roadmap(user_id)
+        roadmap = await get_latest_roadmap(user_id)
         
         # Also load into AI memory for chat context
         if roadmap and user_id:
-            if user_id not in shared_ai_engine.user_data:
-                shared_ai_engine.user_data[user_id] = {}
-            shared_ai_engine.user_data[user_id]["roadmap"] = roadmap.get("roadmap_json", {})
-            shared_ai_engine.user_data[user_id]["roadmap_goal"] = roadmap.get("title", "")
+            await run_io(_remember_roadmap, user_id, roadmap.get("roadmap_json", {}), roadmap.get("title", ""))
         
         return {"roadmap": roadmap}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -61,7 +69,7 @@ async def get_user_latest_roadmap(user_id: str):
 async def update_progress(update: ProgressUpdate):
     """Update roadmap progress."""
     try:
-        result = update_roadmap_progress(
+        result = await update_roadmap_progress(
             update.roadmap_id,
             update.progress,
             update.completed_weeks
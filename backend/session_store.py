@@ -0,0 +1,348 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Optional
+
+SESSION_MAX_USERS = int(os.getenv("SESSION_MAX_USERS", "10000"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(128 * 1024 * 1024)))
+SESSION_IDLE_TTL = int(os.getenv("SESSION_IDLE_TTL", "1800"))
+# "memory" (per process) or "sqlite" (one file shared by every worker on the host)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "sessions.db")
+
+
+class SessionConflict(Exception):
+    """Raised when a session changed since it was read (versioned write lost)"""
+
+
+@dataclass(slots=True)
+class UserSession:
+    """Per-user context kept in memory between requests"""
+    resume_text: str = ""
+    # Retrieval index over resume_text chunks (ResumeIndex.to_dict form)
+    resume_index: Dict = field(default_factory=dict)
+    # Section span table of resume_text (ResumeSections.to_dict form)
+    resume_sections: Dict = field(default_factory=dict)
+    target_role: str = ""
+    sector: str = "general"
+    skills_have: List[str] = field(default_factory=list)
+    skills_need: List[str] = field(default_factory=list)
+    roadmap: Dict = field(default_factory=dict)
+    roadmap_goal: str = ""
+    # Rolling conversation state, updated once per saved message (see record_message)
+    topic_window: List[List[str]] = field(default_factory=list)
+    topic_counts: Dict[str, int] = field(default_factory=dict)
+    last_reply_topics: List[str] = field(default_factory=list)
+    message_count: int = 0
+    # False until the window is seeded from stored chat history
+    history_loaded: bool = False
+    # Bumped on every successful put; a put carrying a stale version is rejected
+    version: int = 0
+
+    def estimated_bytes(self) -> int:
+        """Rough memory footprint, dominated by the resume text and roadmap"""
+        size = sys.getsizeof(self.resume_text) + 256
+        size += sum(sys.getsizeof(skill) for skill in self.skills_have)
+        size += sum(sys.getsizeof(skill) for skill in self.skills_need)
+        for week, details in self.roadmap.items():
+            size += sys.getsizeof(week) + 64
+            size += sys.getsizeof(details.get("topic", ""))
+            size += sum(sys.getsizeof(r) for r in details.get("resources", ()))
+        size += 64 * (len(self.topic_window) + len(self.topic_counts))
+        # Postings dominate the index: three list entries per (term, chunk)
+        size += 96 * len(self.resume_index.get("docs", ())) + 64 * len(self.resume_index.get("terms", ()))
+        size += 96 * len(self.resume_sections.get("spans", ()))
+        return size
+
+    def record_message(self, role: str, topics: List[str], window: int):
+        """Push one message's topics into the window, dropping the oldest past `window`"""
+        self.topic_window.append(topics)
+        for topic in topics:
+            self.topic_counts[topic] = self.topic_counts.get(topic, 0) + 1
+        while len(self.topic_window) > window:
+            for topic in self.topic_window.pop(0):
+                remaining = self.topic_counts[topic] - 1
+                if remaining:
+                    self.topic_counts[topic] = remaining
+                else:
+                    del self.topic_counts[topic]
+        if role == "assistant":
+            self.last_reply_topics = topics
+        self.message_count += 1
+
+
+class SessionStore:
+    """In-process LRU session store with idle-TTL expiry and a memory budget.
+
+    Evicted users are not lost: routes rebuild their session from Supabase
+    the next time they are seen (see CareerAI.session_from_db).
+    """
+
+    def __init__(self, max_users: int = SESSION_MAX_USERS, max_bytes: int = SESSION_MAX_BYTES,
+                 idle_ttl: float = SESSION_IDLE_TTL):
+        self.max_users = max_users
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        # user_id -> (session, last access, estimated bytes)
+        self._sessions: "OrderedDict[str, list]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, user_id: str) -> Optional[UserSession]:
+        with self._lock:
+            entry = self._sessions.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            now = time.monotonic()
+            if now - entry[1] > self.idle_ttl:
+                self._drop(user_id)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            entry[1] = now
+            self._sessions.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, user_id: str, session: UserSession, force: bool = False):
+        """Store (or re-store after mutating) a session and re-measure it.
+
+        Unless force is set, the write only succeeds if the stored copy still
+        has the version the caller read; otherwise SessionConflict is raised.
+        """
+        size = session.estimated_bytes()
+        with self._lock:
+            entry = self._sessions.get(user_id)
+            if entry is not None:
+                if not force and entry[0] is not session and entry[0].version != session.version:
+                    raise SessionConflict(user_id)
+                self._drop(user_id)
+            elif not force and session.version != 0:
+                raise SessionConflict(user_id)
+            session.version += 1
+            self._sessions[user_id] = [session, time.monotonic(), size]
+            self._bytes += size
+            self._evict()
+
+    def get_or_create(self, user_id: str) -> UserSession:
+        with self._lock:
+            session = self.get(user_id)
+            if session is None:
+                session = UserSession()
+                self.put(user_id, session)
+            return session
+
+    def pop(self, user_id: str) -> Optional[UserSession]:
+        with self._lock:
+            if user_id not in self._sessions:
+                return None
+            return self._drop(user_id)
+
+    def __contains__(self, user_id: str) -> bool:
+        with self._lock:
+            entry = self._sessions.get(user_id)
+            return entry is not None and time.monotonic() - entry[1] <= self.idle_ttl
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _drop(self, user_id: str) -> UserSession:
+        session, _, size = self._sessions.pop(user_id)
+        self._bytes -= size
+        return session
+
+    def _evict(self):
+        now = time.monotonic()
+        # Oldest entries sit at the front: expire idle ones, then trim to budget
+        while self._sessions:
+            user_id, (_, last_access, _) = next(iter(self._sessions.items()))
+            if now - last_access > self.idle_ttl:
+                self._drop(user_id)
+                self.expirations += 1
+            elif len(self._sessions) > self.max_users or (self._bytes > self.max_bytes and len(self._sessions) > 1):
+                self._drop(user_id)
+                self.evictions += 1
+            else:
+                break
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "users": len(self._sessions),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+_SESSION_FIELDS = [f.name for f in fields(UserSession) if f.name != "version"]
+
+
+class SQLiteSessionStore:
+    """Session store in a SQLite file, shared by every worker process on a host.
+
+    Same interface as SessionStore. Each get reads the current row, so an edit
+    made in one worker is visible to the others on their next request; writes
+    are compare-and-set on the row version.
+    """
+
+    def __init__(self, path: str = SESSION_DB_PATH, max_users: int = SESSION_MAX_USERS,
+                 idle_ttl: float = SESSION_IDLE_TTL):
+        self.path = path
+        self.max_users = max_users
+        self.idle_ttl = idle_ttl
+        self._local = threading.local()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.conflicts = 0
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " user_id TEXT PRIMARY KEY,"
+                " version INTEGER NOT NULL,"
+                " data TEXT NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_accessed ON sessions(accessed_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, user_id: str) -> Optional[UserSession]:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT version, data, accessed_at FROM sessions WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        version, data, accessed_at = row
+        now = time.time()
+        if now - accessed_at > self.idle_ttl:
+            conn.execute("DELETE FROM sessions WHERE user_id = ? AND version = ?", (user_id, version))
+            self.expirations += 1
+            self.misses += 1
+            return None
+        # Refresh the idle clock at most once a minute to keep reads read-only
+        if now - accessed_at > 60:
+            conn.execute("UPDATE sessions SET accessed_at = ? WHERE user_id = ?", (now, user_id))
+        self.hits += 1
+        return UserSession(version=version, **json.loads(data))
+
+    def put(self, user_id: str, session: UserSession, force: bool = False):
+        """Versioned write; see SessionStore.put"""
+        data = json.dumps({name: getattr(session, name) for name in _SESSION_FIELDS})
+        now = time.time()
+        conn = self._conn()
+        if force:
+            version = conn.execute(
+                "INSERT INTO sessions (user_id, version, data, accessed_at) VALUES (?, 1, ?, ?)"
+                " ON CONFLICT(user_id) DO UPDATE SET version = version + 1, data = excluded.data,"
+                " accessed_at = excluded.accessed_at RETURNING version",
+                (user_id, data, now)
+            ).fetchone()[0]
+        elif session.version == 0:
+            row = conn.execute(
+                "INSERT INTO sessions (user_id, version, data, accessed_at) VALUES (?, 1, ?, ?)"
+                " ON CONFLICT(user_id) DO NOTHING RETURNING version",
+                (user_id, data, now)
+            ).fetchone()
+            if row is None:
+                self.conflicts += 1
+                raise SessionConflict(user_id)
+            version = row[0]
+        else:
+            row = conn.execute(
+                "UPDATE sessions SET version = version + 1, data = ?, accessed_at = ?"
+                " WHERE user_id = ? AND version = ? RETURNING version",
+                (data, now, user_id, session.version)
+            ).fetchone()
+            if row is None:
+                self.conflicts += 1
+                raise SessionConflict(user_id)
+            version = row[0]
+        session.version = version
+
+        self._puts += 1
+        if self._puts % 100 == 0:
+            self._evict()
+
+    def get_or_create(self, user_id: str) -> UserSession:
+        session = self.get(user_id)
+        if session is None:
+            session = UserSession()
+            try:
+                self.put(user_id, session)
+            except SessionConflict:
+                session = self.get(user_id) or session
+        return session
+
+    def pop(self, user_id: str) -> Optional[UserSession]:
+        session = self.get(user_id)
+        if session is not None:
+            self._conn().execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+        return session
+
+    def __contains__(self, user_id: str) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM sessions WHERE user_id = ? AND accessed_at >= ?",
+            (user_id, time.time() - self.idle_ttl)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def _evict(self):
+        conn = self._conn()
+        expired = conn.execute(
+            "DELETE FROM sessions WHERE accessed_at < ?", (time.time() - self.idle_ttl,)
+        ).rowcount
+        self.expirations += expired
+        overflow = len(self) - self.max_users
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM sessions WHERE user_id IN"
+                " (SELECT user_id FROM sessions ORDER BY accessed_at LIMIT ?)", (overflow,)
+            )
+            self.evictions += overflow
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "users": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "conflicts": self.conflicts,
+        }
+
+
+def create_session_store():
+    """Build the session backend selected by SESSION_BACKEND"""
+    if SESSION_BACKEND == "sqlite":
+        return SQLiteSessionStore()
+    if SESSION_BACKEND != "memory":
+        print(f"Unknown SESSION_BACKEND '{SESSION_BACKEND}', using in-memory sessions")
+    return SessionStore()
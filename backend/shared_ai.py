@@ -1,5 +1,43 @@
 # Shared AI instance for all routes
+import threading
+from typing import Optional
+
+from concurrency import run_cpu
 from rag_engine import CareerAI
 
+_engine: Optional[CareerAI] = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> CareerAI:
+    """The process-wide engine, built on first use (not at import)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = CareerAI()
+    return _engine
+
+def engine_ready() -> bool:
+    return _engine is not None
+
+async def ensure_engine():
+    """Wait for the engine without building it on the event loop (a router dependency).
+
+    The first request before warm-up finishes builds it on the engine pool,
+    like warm-up does; later calls return at once.
+    """
+    if _engine is None:
+        await run_cpu(get_engine)
+
+class _LazyEngine:
+    """Stands in for the engine so routes can keep `shared_ai_engine.<attr>`.
+
+    Touching it builds the engine in the calling thread; routers depend on
+    ensure_engine so that never happens on the event loop.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_engine(), name)
+
 # Single shared instance - all routes use this
-shared_ai_engine = CareerAI()
+shared_ai_engine = _LazyEngine()
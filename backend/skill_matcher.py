@@ -0,0 +1,88 @@
+import re
+from typing import Dict, Iterable, List, Sequence
+
+# A keyword only counts when it is not glued to other letters/digits,
+# so "Git" no longer matches inside "digital" and "Java" inside "JavaScript".
+_LEFT_EDGE = r"(?<![a-z0-9])"
+_RIGHT_EDGE = r"(?![a-z0-9])"
+
+
+def trie_pattern(phrases: Sequence[str]) -> str:
+    """Regex alternation of phrases, factored by shared prefixes.
+
+    Siblings start with distinct characters and optional tails are greedy,
+    so at any position the pattern matches the longest phrase there.
+    """
+    trie: Dict = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return emit(trie)
+
+
+class SkillMatcher:
+    """Finds every keyword in a text with one compiled regex pass"""
+
+    def __init__(self, keywords: Iterable[str]):
+        # normalized form -> first spelling we were given
+        self.canonical: Dict[str, str] = {}
+        for keyword in keywords:
+            norm = keyword.strip().lower()
+            if norm and norm not in self.canonical:
+                self.canonical[norm] = keyword.strip()
+
+        terms = list(self.canonical)
+        
+        # The regex reports one keyword per start position, so remember which
+        # shorter keywords are whole-word prefixes of a longer one
+        # ("data" inside "data analysis") and report them alongside it.
+        self._nested: Dict[str, List[str]] = {}
+        for term in terms:
+            nested = [
+                term[:end] for end in range(len(term) - 1, 0, -1)
+                if not term[end].isalnum() and term[:end] in self.canonical
+            ]
+            if nested:
+                self._nested[term] = nested
+        if terms:
+            # Prefix-trie alternation: the longest keyword at a spot is tried
+            # first ("rest api" before "rest") and the pattern stays fast with
+            # tens of thousands of keywords.
+            body = trie_pattern(terms)
+            # Zero-width lookahead lets overlapping keywords ("patient care planning"
+            # -> "patient care" + "care planning") both be reported.
+            self._pattern = re.compile(f"(?={_LEFT_EDGE}({body}){_RIGHT_EDGE})", re.IGNORECASE)
+        else:
+            self._pattern = None
+
+    def scan(self, text: str) -> Dict[str, List[int]]:
+        """Return {normalized keyword: [start positions]} for every keyword in text"""
+        hits: Dict[str, List[int]] = {}
+        if not text or self._pattern is None:
+            return hits
+        for match in self._pattern.finditer(text):
+            norm = match.group(1).lower()
+            start = match.start()
+            hits.setdefault(norm, []).append(start)
+            for shorter in self._nested.get(norm, ()):
+                hits.setdefault(shorter, []).append(start)
+        return hits
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """Return {canonical keyword: number of occurrences}"""
+        return {self.canonical[norm]: len(positions) for norm, positions in self.scan(text).items()}
+
+    def find(self, text: str) -> List[str]:
+        """Return canonical keywords present in text, in order of first appearance"""
+        hits = self.scan(text)
+        return [self.canonical[norm] for norm in sorted(hits, key=lambda n: hits[n][0])]
@@ -11,6 +11,8 @@ CREATE TABLE IF NOT EXISTS resumes (
     target_role TEXT NOT NULL,
     analysis_json JSONB NOT NULL,
     resume_content TEXT,
+    resume_index JSONB,
+    resume_sections JSONB,
     ats_score INTEGER DEFAULT 0,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -56,3 +58,9 @@ CREATE INDEX IF NOT EXISTS idx_chat_messages_user_id ON chat_messages(user_id);
 ALTER TABLE roadmaps ADD COLUMN IF NOT EXISTS progress INTEGER DEFAULT 0;
 ALTER TABLE roadmaps ADD COLUMN IF NOT EXISTS completed_weeks JSONB DEFAULT '[]';
 ALTER TABLE roadmaps ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+-- Retrieval index over the resume's chunks, built at analysis time
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS resume_index JSONB;
+
+-- Section span table (name, start, end) of the resume text, built at analysis time
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS resume_sections JSONB;
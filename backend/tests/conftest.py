@@ -0,0 +1,8 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# No background knowledge-base polling or API probing while testing
+os.environ.setdefault("KB_RELOAD_INTERVAL", "0")
+os.environ.setdefault("API_PROBE_INTERVAL", "0")
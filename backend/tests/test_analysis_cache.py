@@ -0,0 +1,49 @@
+import os
+import time
+
+from analysis_cache import AnalysisCache, TTLCache
+
+
+def test_non_ascii_text_counts_its_real_size():
+    cache = TTLCache(max_bytes=10_000, ttl=60)
+    cache.put("ascii", "a" * 1000)
+    ascii_bytes = cache.stats()["bytes"]
+    cache.clear()
+    cache.put("cjk", "履" * 1000)
+
+    assert ascii_bytes >= 1000
+    assert cache.stats()["bytes"] >= 2000
+
+
+def test_budget_holds_for_non_ascii_values():
+    cache = TTLCache(max_bytes=8_000, ttl=60)
+    for i in range(10):
+        cache.put(f"k{i}", "😀" * 500)
+
+    assert cache.stats()["bytes"] <= 8_000
+    assert cache.stats()["evictions"] > 0
+    assert cache.get("k9") == "😀" * 500
+
+
+def test_disk_tier_evicts_the_oldest_files_past_its_cap(tmp_path):
+    cache = AnalysisCache(disk_dir=str(tmp_path), disk_max_bytes=50_000)
+    for i in range(100):
+        cache.put_text(f"{i:064x}", "x" * 1000, [])
+        # Distinct mtimes, oldest first
+        path = os.path.join(tmp_path, f"text-{i:064x}.json")
+        os.utime(path, (time.time() - 1000 + i, time.time() - 1000 + i))
+
+    files = os.listdir(tmp_path)
+    assert sum(os.path.getsize(os.path.join(tmp_path, name)) for name in files) <= 50_000
+    assert f"text-{99:064x}.json" in files
+    assert f"text-{0:064x}.json" not in files
+
+
+def test_disk_tier_drops_expired_files_on_start(tmp_path):
+    AnalysisCache(disk_dir=str(tmp_path)).put_text("a" * 64, "old", [])
+    path = os.path.join(tmp_path, "text-" + "a" * 64 + ".json")
+    os.utime(path, (time.time() - 7200, time.time() - 7200))
+
+    AnalysisCache(ttl=3600, disk_dir=str(tmp_path))
+
+    assert not os.path.exists(path)
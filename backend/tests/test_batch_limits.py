@@ -0,0 +1,131 @@
+import asyncio
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+import batch_analysis
+from batch_analysis import BatchBudget, BatchTooLarge, unpack_archive
+
+
+def make_zip(path, members):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members:
+            zf.writestr(name, data)
+
+
+def test_zip_bomb_member_is_refused_before_it_is_written(tmp_path):
+    archive = tmp_path / "bomb.zip"
+    # 64 MB of zeros compresses to a few tens of KB
+    make_zip(archive, [("ok.pdf", b"%PDF-1.4 small"), ("bomb.pdf", bytes(64 * 1024 * 1024))])
+    assert archive.stat().st_size < 1024 * 1024
+    out = tmp_path / "out"
+    out.mkdir()
+
+    with pytest.raises(BatchTooLarge):
+        unpack_archive(str(archive), str(out), BatchBudget())
+
+    assert sum(f.stat().st_size for f in out.iterdir()) < 1024
+
+
+def test_total_bytes_are_capped_across_members(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_analysis, "BATCH_MAX_PDF_BYTES", 1000)
+    archive = tmp_path / "many.zip"
+    make_zip(archive, [(f"{i}.pdf", bytes(900)) for i in range(10)])
+    out = tmp_path / "out"
+    out.mkdir()
+
+    with pytest.raises(BatchTooLarge):
+        unpack_archive(str(archive), str(out), BatchBudget(max_bytes=4000))
+
+    assert len(list(out.iterdir())) == 4
+
+
+def test_unpacking_stops_at_the_file_cap(tmp_path):
+    archive = tmp_path / "many.tar.gz"
+    with tarfile.open(archive, "w:gz") as tf:
+        for i in range(50):
+            info = tarfile.TarInfo(f"resumes/{i}.pdf")
+            info.size = 3
+            tf.addfile(info, io.BytesIO(b"pdf"))
+    out = tmp_path / "out"
+    out.mkdir()
+
+    with pytest.raises(BatchTooLarge):
+        unpack_archive(str(archive), str(out), BatchBudget(max_files=5))
+
+    assert len(os.listdir(out)) == 5
+
+
+def test_archive_within_limits_is_unpacked_under_numbered_names(tmp_path):
+    archive = tmp_path / "cohort.zip"
+    make_zip(archive, [("../evil.pdf", b"a"), ("notes.txt", b"b"), ("cv/jane.pdf", b"c")])
+    out = tmp_path / "out"
+    out.mkdir()
+
+    found = unpack_archive(str(archive), str(out), BatchBudget())
+
+    assert [name for name, _ in found] == ["../evil.pdf", "cv/jane.pdf"]
+    assert sorted(os.listdir(out)) == ["000000.pdf", "000001.pdf"]
+
+
+def start_batch(monkeypatch, tmp_path):
+    """Calls the batch endpoint with one small PDF; the response and its workdir"""
+    from fastapi import UploadFile
+    from routers import resume
+
+    workdirs = []
+
+    def mkdtemp(prefix):
+        workdirs.append(str(tmp_path / f"{prefix}{len(workdirs)}"))
+        os.mkdir(workdirs[-1])
+        return workdirs[-1]
+
+    monkeypatch.setattr(resume.tempfile, "mkdtemp", mkdtemp)
+    upload = UploadFile(io.BytesIO(b"%PDF-1.4 small"), filename="jane.pdf", size=14)
+    response = asyncio.run(resume.analyze_resume_batch(files=[upload], target_roles="Nurse", user_id=None))
+    assert os.path.isdir(workdirs[0])
+    assert not batch_analysis.batch_slot.acquire(blocking=False)
+    return response, workdirs[0]
+
+
+async def receive():
+    await asyncio.Event().wait()
+
+
+def test_batch_disconnected_before_the_first_line_frees_the_slot(monkeypatch, tmp_path):
+    from starlette.requests import ClientDisconnect
+
+    response, workdir = start_batch(monkeypatch, tmp_path)
+
+    async def send(message):
+        raise OSError("connection reset")
+
+    with pytest.raises(ClientDisconnect):
+        asyncio.run(response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send))
+
+    assert not os.path.exists(workdir)
+    assert batch_analysis.batch_slot.acquire(blocking=False)
+    batch_analysis.batch_slot.release()
+
+
+def test_batch_cancelled_before_the_first_line_frees_the_slot(monkeypatch, tmp_path):
+    response, workdir = start_batch(monkeypatch, tmp_path)
+
+    async def send(message):
+        await asyncio.Event().wait()
+
+    async def cancel_while_starting():
+        task = asyncio.create_task(response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_while_starting())
+
+    assert not os.path.exists(workdir)
+    assert batch_analysis.batch_slot.acquire(blocking=False)
+    batch_analysis.batch_slot.release()
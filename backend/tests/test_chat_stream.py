@@ -0,0 +1,92 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from fastapi import BackgroundTasks
+
+from models import ChatRequest
+from rag_engine import CareerAI
+from routers import chat
+from session_store import SessionConflict, SessionStore, UserSession
+
+USER = "5b0c8a8e-5d0f-4d3c-9a53-0d6f3c1f2a10"
+
+
+class ConflictingStore(SessionStore):
+    """Every versioned write loses to another worker"""
+
+    def put(self, user_id, session, force=False):
+        if not force:
+            raise SessionConflict(user_id)
+        super().put(user_id, session, force=True)
+
+
+async def open_stream(monkeypatch, engine):
+    saved = []
+
+    async def no_row(user_id):
+        return None
+
+    async def no_history(user_id, limit=10):
+        return []
+
+    monkeypatch.setattr(chat, "shared_ai_engine", engine)
+    monkeypatch.setattr(chat, "get_user_resume_content", no_row)
+    monkeypatch.setattr(chat, "get_latest_roadmap", no_row)
+    monkeypatch.setattr(chat.chat_writer, "get_chat_history", no_history)
+    monkeypatch.setattr(chat.chat_writer, "enqueue", saved.extend)
+    request = ChatRequest(user_id=USER, message="tell me about quantum gardening")
+    return await chat.stream_message(request, BackgroundTasks()), saved
+
+
+def test_disconnect_closes_the_reply_generator(monkeypatch):
+    closed = threading.Event()
+
+    def segments():
+        try:
+            for i in range(1000):
+                yield f"token {i} "
+        finally:
+            # Where the model client gives back its slot and connection
+            closed.set()
+
+    # Held elsewhere too (as a traceback or cycle would), so refcounting alone won't close it
+    held = []
+
+    def stream_chat(user_id, message, **_):
+        held.append(segments())
+        return "default", held[-1]
+
+    engine = SimpleNamespace(sessions=SessionStore(), stream_chat=stream_chat,
+                             session_from_db=lambda resume, roadmap: None)
+
+    async def scenario():
+        response, saved = await open_stream(monkeypatch, engine)
+        body = response.body_iterator
+        events = [await body.__anext__() for _ in range(3)]
+        # The client goes away after two tokens
+        await body.aclose()
+        return events, saved
+
+    events, saved = asyncio.run(scenario())
+
+    assert events[0].startswith("event: meta") and events[2].startswith("event: token")
+    assert closed.is_set()
+    assert saved == []
+
+
+def test_reply_is_saved_when_the_session_write_keeps_conflicting(monkeypatch):
+    ai = CareerAI()
+    ai.sessions = ConflictingStore()
+    ai.sessions.put(USER, UserSession(), force=True)
+
+    async def scenario():
+        response, saved = await open_stream(monkeypatch, ai)
+        return [event async for event in response.body_iterator], saved
+
+    events, saved = asyncio.run(scenario())
+
+    assert events[-1].startswith("event: done")
+    assert not any(event.startswith("event: error") for event in events)
+    assert [row["role"] for row in saved] == ["user", "assistant"]
+    assert saved[1]["content"]
@@ -0,0 +1,116 @@
+import asyncio
+import uuid
+
+import httpx
+
+import chat_writer
+import database_async
+from chat_writer import ChatWriteBuffer
+from database_async import RowsRejected
+
+
+class FakeTable:
+    """chat_messages stand-in: rejects batches holding a non-UUID user_id, skips stored ids"""
+
+    def __init__(self):
+        self.rows = {}
+        self.calls = 0
+        self.down = False
+
+    async def save(self, messages, timeout=None):
+        self.calls += 1
+        if self.down:
+            return None
+        for message in messages:
+            try:
+                uuid.UUID(message["user_id"])
+            except ValueError:
+                raise RowsRejected(f"HTTP 400: invalid input syntax for type uuid: {message['user_id']}")
+        inserted = [m for m in messages if m["id"] not in self.rows]
+        self.rows.update((m["id"], m) for m in inserted)
+        return inserted
+
+
+def message(user_id, content):
+    return {"user_id": user_id, "role": "user", "content": content}
+
+
+def run_flush(monkeypatch, table, batches):
+    monkeypatch.setattr(chat_writer, "save_chat_messages", table.save)
+
+    async def scenario():
+        buffer = ChatWriteBuffer(batch_size=8, interval=60)
+        for batch in batches:
+            buffer.enqueue(batch)
+        await buffer.flush()
+        buffer._task.cancel()
+        return buffer
+
+    return asyncio.run(scenario())
+
+
+def test_poison_row_is_isolated_and_the_rest_is_written(monkeypatch):
+    table = FakeTable()
+    good = str(uuid.uuid4())
+    messages = [message(good, f"m{i}") for i in range(11)]
+    messages.insert(5, message("not-a-uuid", "poison"))
+
+    buffer = run_flush(monkeypatch, table, [messages])
+
+    assert sorted(m["content"] for m in table.rows.values()) == sorted(f"m{i}" for i in range(11))
+    assert buffer.stats()["queue_depth"] == 0
+    assert buffer.stats()["rejected"] == 1
+    assert buffer.stats()["flushed"] == 11
+    assert [row["content"] for row in buffer.rejected_rows()] == ["poison"]
+    assert buffer.pending_for("not-a-uuid") == []
+    assert buffer.pending_for(good) == []
+
+
+def test_transport_failure_keeps_the_whole_batch(monkeypatch):
+    table = FakeTable()
+    table.down = True
+    user = str(uuid.uuid4())
+
+    buffer = run_flush(monkeypatch, table, [[message(user, f"m{i}") for i in range(3)]])
+
+    assert table.rows == {}
+    assert buffer.stats()["queue_depth"] == 3
+    assert buffer.stats()["failures"] == 1
+    assert len(buffer.pending_for(user)) == 3
+
+
+def save_with_status(status):
+    """save_chat_messages against a PostgREST stand-in answering with status; returns (result, request)"""
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(status, json=[] if status < 300 else {"message": "failed"})
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        database_async._clients[loop] = httpx.AsyncClient(base_url="http://db/rest/v1",
+                                                          transport=httpx.MockTransport(handler))
+        try:
+            return await database_async.save_chat_messages([message(str(uuid.uuid4()), "hi")])
+        finally:
+            await database_async.close_client()
+
+    try:
+        return asyncio.run(scenario()), seen[0]
+    except RowsRejected as e:
+        return e, seen[0]
+
+
+def test_bulk_insert_skips_rows_already_stored():
+    result, request = save_with_status(201)
+
+    assert result == []
+    assert request.url.params["on_conflict"] == "id"
+    assert "resolution=ignore-duplicates" in request.headers["Prefer"]
+
+
+def test_client_errors_reject_and_server_errors_retry():
+    assert isinstance(save_with_status(400)[0], RowsRejected)
+    assert isinstance(save_with_status(409)[0], RowsRejected)
+    assert save_with_status(503)[0] is None
@@ -0,0 +1,38 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from concurrency import BoundedExecutor
+
+
+def test_cancelled_caller_keeps_its_slot_until_the_thread_finishes():
+    pool = BoundedExecutor("test", max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        caller = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        # The client disconnects; the worker thread is still blocked
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        assert pool.in_flight == 1
+        with pytest.raises(HTTPException) as busy:
+            await pool.run(lambda: None)
+        assert busy.value.status_code == 503
+
+        release.set()
+        for _ in range(100):
+            if pool.in_flight == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.in_flight == 0
+        assert await pool.run(lambda: "done") == "done"
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.shutdown()
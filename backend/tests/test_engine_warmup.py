@@ -0,0 +1,40 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import shared_ai
+from routers import chat
+from session_store import SessionStore
+
+
+class FakeEngine:
+    built_on_loop = []
+
+    def __init__(self):
+        try:
+            asyncio.get_running_loop()
+            FakeEngine.built_on_loop.append(True)
+        except RuntimeError:
+            FakeEngine.built_on_loop.append(False)
+        self.sessions = SessionStore()
+
+
+def test_first_request_builds_the_engine_off_the_event_loop(monkeypatch):
+    monkeypatch.setattr(shared_ai, "_engine", None)
+    monkeypatch.setattr(shared_ai, "CareerAI", FakeEngine)
+
+    async def no_roadmap(user_id):
+        return None
+
+    monkeypatch.setattr(chat, "get_latest_roadmap", no_roadmap)
+    app = FastAPI()
+    app.include_router(chat.router)
+
+    with TestClient(app) as client:
+        # Reads shared_ai_engine.sessions on the loop before anything else
+        assert client.get("/chat/roadmap/u1").json()["source"] == "none"
+        assert client.get("/chat/roadmap/u2").status_code == 200
+
+    assert FakeEngine.built_on_loop == [False]
+    assert isinstance(shared_ai._engine, FakeEngine)
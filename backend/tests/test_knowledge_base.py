@@ -0,0 +1,71 @@
+import json
+import os
+import shutil
+
+import knowledge_base
+from knowledge_base import KB_SOURCE_PATH, KnowledgeBase
+
+
+def make_kb(tmp_path):
+    source = tmp_path / "knowledge_base.json"
+    shutil.copy(KB_SOURCE_PATH, source)
+    return source, KnowledgeBase(str(source), str(tmp_path / "knowledge_base.db"))
+
+
+def edit(source, **changes):
+    data = json.loads(source.read_text())
+    data.update(changes)
+    source.write_text(json.dumps(data))
+    # Some filesystems keep coarse mtimes; make the edit visible regardless
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_edit_is_picked_up(tmp_path):
+    source, kb = make_kb(tmp_path)
+    edit(source, version=kb.version + 1)
+
+    assert kb.reload_if_changed()
+    assert kb.reloads == 1
+    assert not kb.reload_if_changed()
+
+
+def test_failed_compile_is_retried_without_another_edit(tmp_path, monkeypatch):
+    source, kb = make_kb(tmp_path)
+    version = kb.version
+    compile_real = knowledge_base.compile_knowledge_base
+    attempts = []
+
+    def flaky_compile(*args):
+        attempts.append(args)
+        if len(attempts) == 1:
+            raise OSError("disk full")
+        return compile_real(*args)
+
+    monkeypatch.setattr(knowledge_base, "compile_knowledge_base", flaky_compile)
+    edit(source, version=version + 1)
+
+    assert not kb.reload_if_changed()
+    assert kb.version == version
+    # Same source file, nothing edited since: the next check compiles it
+    assert kb.reload_if_changed()
+    assert kb.version == version + 1
+    assert len(attempts) == 2
+
+
+def test_read_only_source_directory_compiles_into_the_temp_dir(tmp_path, monkeypatch):
+    source_dir, temp_dir = tmp_path / "deploy", tmp_path / "tmp"
+    source_dir.mkdir()
+    temp_dir.mkdir()
+    source = source_dir / "knowledge_base.json"
+    shutil.copy(KB_SOURCE_PATH, source)
+    writable = os.access
+    monkeypatch.setattr(knowledge_base.os, "access",
+                        lambda path, mode: False if path == str(source_dir) else writable(path, mode))
+    monkeypatch.setattr(knowledge_base.tempfile, "tempdir", str(temp_dir))
+
+    kb = KnowledgeBase(str(source))
+
+    assert os.path.dirname(kb.db_path) == str(temp_dir)
+    assert os.listdir(source_dir) == ["knowledge_base.json"]
+    assert kb.role_requirements()
@@ -0,0 +1,59 @@
+import pytest
+
+import pdf_extract
+
+
+def make_pdf(pages) -> bytes:
+    """Smallest valid PDF with one line of Helvetica text per page"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>",
+               "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages))),
+                                                          len(pages)),
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    for i, line in enumerate(pages):
+        content = f"BT /F1 12 Tf 50 750 Td ({line}) Tj ET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {5 + 2 * i} 0 R "
+                       "/Resources << /Font << /F1 3 0 R >> >> >>")
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+    out = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode("latin-1")
+
+
+@pytest.fixture
+def parallel(monkeypatch):
+    """Force the page pool on, whatever the CPU count"""
+    pdf_extract.shutdown_pool()
+    monkeypatch.setattr(pdf_extract, "PDF_WORKERS", 2)
+    monkeypatch.setattr(pdf_extract, "PDF_PARALLEL_PAGES", 2)
+    yield
+    pdf_extract.shutdown_pool()
+
+
+def test_parallel_pages_match_the_sequential_path(parallel, tmp_path):
+    path = tmp_path / "long.pdf"
+    path.write_bytes(make_pdf([f"Page {i} worked on python services" for i in range(7)]))
+
+    parallel_text = pdf_extract.extract_text(str(path))
+    sequential_text = pdf_extract.extract_text(path.read_bytes())
+
+    assert pdf_extract._pool is not None
+    assert pdf_extract._pool._mp_context.get_start_method() == "spawn"
+    assert parallel_text == sequential_text
+    assert "Page 0 worked" in parallel_text and "Page 6 worked" in parallel_text
+
+
+def test_parallel_pages_respect_the_character_cap(parallel, tmp_path):
+    path = tmp_path / "long.pdf"
+    path.write_bytes(make_pdf([f"Page {i} worked on python services" for i in range(7)]))
+
+    capped = pdf_extract.extract_text(str(path), max_chars=50)
+
+    assert capped == pdf_extract.extract_text(path.read_bytes(), max_chars=50)
+    assert len(capped.replace("\n", "")) == 50
@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from rag_engine import CareerAI
+
+ROLES = ["Data Scientist", "Registered Nurse", "Marketing Manager", "Teacher", "Financial Analyst",
+         "Civil Engineer", "Chef", ""]
+
+
+@pytest.fixture(scope="module")
+def ai():
+    return CareerAI()
+
+
+def resumes(ai, count=40):
+    rng = random.Random(11)
+    words = [skill for sector in ai.skill_keywords.values() for skill in sector]
+    words += ["experience", "experienced", "education", "skills", "patient", "hospital", "marketing",
+              "students", "2019", "led", "manager", "data", "teacher", "engineering", "finance"]
+    return [" ".join(rng.choices(words, k=rng.randint(5, 600))) for _ in range(count)]
+
+
+def test_with_role_matches_a_full_extract(ai):
+    extractor = ai.feature_extractor
+    for text in resumes(ai):
+        base = extractor.extract(text)
+        for role in ROLES:
+            assert vars(extractor.with_role(base, role)) == vars(extractor.extract(text, role))
+
+
+def test_assess_resume_from_base_features_matches_a_single_role_run(ai):
+    for text in resumes(ai, 10):
+        base = ai.extract_features(text)
+        for role in ROLES:
+            assert ai.assess_resume(text, role, base) == ai.assess_resume(text, role)
+
+
+def test_sections_and_role_words_match_as_substrings(ai):
+    features = ai.extract_features("Experienced in marketing, managers' trusted partner", "Marketing Manager")
+
+    assert "experience" in features.sections
+    assert features.role_word_hits == ["marketing", "manager"]
+
+
+def test_sector_terms_still_need_whole_words(ai):
+    # "rn" inside "modern" and "learn" is not a nursing resume
+    assert ai.extract_features("modern web stack, eager to learn").sector != "nursing"
@@ -0,0 +1,24 @@
+from rag_engine import CareerAI
+
+RESUME = """Jane Doe
+SUMMARY
+Data analyst moving into data science. Python, SQL, Tableau and Excel.
+EXPERIENCE
+Analyst at Acme (2019-2023): built dashboards, cut reporting time 40%.
+EDUCATION
+B.Sc. Statistics
+SKILLS
+Python, SQL, Machine Learning, Communication
+"""
+
+
+def test_roles_are_reported_by_catalog_name_with_single_role_scores():
+    ai = CareerAI()
+    names = list(ai.knowledge_base.role_requirements())
+    ranked = ai.score_roles(RESUME)
+
+    assert sorted(r["role"] for r in ranked) == sorted(names)
+    assert {"Data Scientist", "MBBS", "DevOps Engineer"} <= set(names)
+    for result in ranked:
+        assert result["ats_score"] == ai.calculate_ats_score(RESUME, result["role"])
+    assert ai.score_roles(RESUME, limit=3) == ranked[:3]
@@ -0,0 +1,112 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from models import ChatRequest
+from routers import chat
+from session_store import SessionConflict, SessionStore, SQLiteSessionStore, UserSession
+
+USER = "5b0c8a8e-5d0f-4d3c-9a53-0d6f3c1f2a10"
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Two SQLite stores on one file, as two uvicorn workers would have"""
+    path = str(tmp_path / "sessions.db")
+    return SQLiteSessionStore(path), SQLiteSessionStore(path)
+
+
+def test_second_writer_of_a_version_conflicts(workers):
+    first, second = workers
+    first.put(USER, UserSession(target_role="Nurse"))
+
+    mine, theirs = first.get(USER), second.get(USER)
+    theirs.target_role = "Teacher"
+    second.put(USER, theirs)
+    mine.target_role = "Data Scientist"
+    with pytest.raises(SessionConflict):
+        first.put(USER, mine)
+
+    assert first.get(USER).target_role == "Teacher"
+    assert first.stats()["conflicts"] == 1
+
+
+def test_two_creators_of_a_new_session_conflict(workers):
+    first, second = workers
+    first.put(USER, UserSession(target_role="Nurse"))
+    with pytest.raises(SessionConflict):
+        second.put(USER, UserSession(target_role="Teacher"))
+    # get_or_create settles on the stored copy instead
+    assert second.get_or_create(USER).target_role == "Nurse"
+
+
+def test_forced_write_overrides_a_stale_version(workers):
+    first, second = workers
+    first.put(USER, UserSession())
+    stale = first.get(USER)
+    second.put(USER, second.get(USER))
+
+    stale.sector = "healthcare"
+    first.put(USER, stale, force=True)
+    assert second.get(USER).sector == "healthcare"
+
+
+def test_in_memory_store_rejects_a_stale_copy():
+    store = SessionStore()
+    store.put(USER, UserSession())
+    stale = UserSession(version=store.get(USER).version)
+    store.put(USER, store.get(USER))
+    with pytest.raises(SessionConflict):
+        store.put(USER, stale)
+
+
+def racing_turn(store, other, races: int):
+    """Engine stand-in: reads the session, loses `races` writes to another worker, then saves"""
+    calls = []
+
+    def turn(user_id, message, **_):
+        calls.append(message)
+        session = store.get(user_id)
+        if len(calls) <= races:
+            theirs = other.get(user_id)
+            theirs.message_count += 10
+            other.put(user_id, theirs)
+        session.message_count += 1
+        store.put(user_id, session)
+        return "reply", "general"
+
+    return turn, calls
+
+
+def run_turn(monkeypatch, store, turn):
+    monkeypatch.setattr(chat, "shared_ai_engine", SimpleNamespace(sessions=store))
+    request = ChatRequest(user_id=USER, message="hello")
+    return asyncio.run(chat._run_turn(turn, request, None, []))
+
+
+def test_turn_that_loses_a_race_is_redone_on_the_fresh_copy(monkeypatch, workers):
+    first, second = workers
+    first.put(USER, UserSession())
+    turn, calls = racing_turn(first, second, races=1)
+
+    (reply, intent), _ = run_turn(monkeypatch, first, turn)
+
+    assert (reply, intent) == ("reply", "general")
+    assert len(calls) == 2
+    # Neither writer's update was lost
+    assert first.get(USER).message_count == 11
+
+
+def test_turn_that_loses_twice_answers_409(monkeypatch, workers):
+    first, second = workers
+    first.put(USER, UserSession())
+    turn, calls = racing_turn(first, second, races=2)
+
+    with pytest.raises(HTTPException) as raised:
+        run_turn(monkeypatch, first, turn)
+
+    assert raised.value.status_code == 409
+    assert len(calls) == 2
+    assert first.get(USER).message_count == 20
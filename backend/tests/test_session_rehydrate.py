@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+import pytest
+
+from rag_engine import CareerAI
+from routers import chat
+from session_store import SessionStore, UserSession
+
+USER = "5b0c8a8e-5d0f-4d3c-9a53-0d6f3c1f2a10"
+RESUME = ("Jane Doe\nEXPERIENCE\nData analyst at Acme 2019-2023, built dashboards in Python and SQL.\n"
+          "EDUCATION\nB.Sc. Statistics\nSKILLS\nPython, SQL, Excel")
+
+
+@pytest.fixture(scope="module")
+def ai():
+    return CareerAI()
+
+
+def rehydrate(monkeypatch, ai, row):
+    """Expire the user's session, then load a chat turn as the route does"""
+    ai.sessions = SessionStore(idle_ttl=0.01)
+    ai.sessions.put(USER, UserSession(target_role="Data Scientist", skills_have=["Python"]), force=True)
+    time.sleep(0.05)
+    assert ai.sessions.get(USER) is None
+
+    async def resume_row(user_id):
+        return row
+
+    async def no_row(user_id):
+        return None
+
+    async def no_history(user_id, limit=10):
+        return []
+
+    monkeypatch.setattr(chat, "shared_ai_engine", ai)
+    monkeypatch.setattr(chat, "get_user_resume_content", resume_row)
+    monkeypatch.setattr(chat, "get_latest_roadmap", no_row)
+    monkeypatch.setattr(chat.chat_writer, "get_chat_history", no_history)
+    resume_context, chat_history = asyncio.run(chat._load_turn_context(USER))
+    return ai.chat_with_intent(USER, "what skills do I have?", resume_context, chat_history)
+
+
+def test_evicted_session_gets_its_skills_back_from_the_stored_analysis(monkeypatch, ai):
+    row = {"resume_content": RESUME, "target_role": "Data Scientist", "analysis_json": {
+        "ats_score": 70, "skills_you_have": ["Python", "SQL"], "skills_you_need": ["Machine Learning"]}}
+
+    reply, intent = rehydrate(monkeypatch, ai, row)
+
+    assert intent == "resume_skills"
+    assert "Python, SQL" in reply and "Machine Learning" in reply
+    assert ai.sessions.get(USER).skills_need == ["Machine Learning"]
+
+
+def test_rows_without_an_analysis_have_their_skills_assessed_again(monkeypatch, ai):
+    row = {"resume_content": RESUME, "target_role": "Data Scientist", "analysis_json": None}
+
+    reply, intent = rehydrate(monkeypatch, ai, row)
+
+    _, _, have, need = ai.assess_resume(RESUME, "Data Scientist")
+    assert have
+    assert intent == "resume_skills"
+    assert ", ".join(have) in reply
+    assert ai.sessions.get(USER).skills_need == need